@@ -3,10 +3,9 @@ from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 from functools import wraps
-import os
-import secrets
-import hashlib
 from datetime import timedelta
+from sqlalchemy import text
+from email_service import generate_otp, generate_otp_salt, hash_otp, verify_otp_hash
 
 # Create blueprint
 admin_bp = Blueprint('admin', __name__)
@@ -18,6 +17,11 @@ Coupon = None
 AdminOTP = None
 MentorPayments = None
 
+# Built once so every create_mentor call reuses the same cached statement
+_MENTOR_COLUMNS_SQL = text(
+    "SELECT column_name FROM information_schema.columns WHERE table_name = 'mentor'"
+)
+
 # Try to import db from main app if available
 try:
     from journal import db as main_db
@@ -573,13 +577,10 @@ def create_mentor():
             password = generate_mentor_password()
             
             # Ensure commission_pct column exists
-            try:
-                from sqlalchemy import text
-                # Test if column exists by trying to select it
-                db.session.execute(text("SELECT commission_pct FROM mentor LIMIT 1"))
-                print("commission_pct column exists")
-            except Exception as e:
-                print(f"commission_pct column issue: {e}")
+            # One catalog lookup instead of probing the column and rolling back on failure
+            mentor_columns = {row[0] for row in db.session.execute(_MENTOR_COLUMNS_SQL)}
+            if 'commission_pct' not in mentor_columns:
+                print("commission_pct column missing from mentor table")
                 # Try to add the column
                 try:
                     db.session.execute(text("ALTER TABLE mentor ADD COLUMN commission_pct REAL DEFAULT 40.0"))
@@ -610,7 +611,6 @@ def create_mentor():
                 db.session.rollback()
                 
                 # Fallback: Create mentor using raw SQL
-                from sqlalchemy import text
                 db.session.execute(
                     text("""
                         INSERT INTO mentor (mentor_id, password_hash, name, email, commission_pct, created_by_admin_id, active, created_at)
@@ -1191,6 +1191,7 @@ def toggle_employee(employee_id):
             employee = employee_dashboard_bp.EmployeeDashboard.query.get_or_404(employee_id)
             employee.is_active = not employee.is_active
             db.session.commit()
+            employee_dashboard_bp.invalidate_employee_session_cache(employee.id)
             status = 'active' if employee.is_active else 'inactive'
             flash(f'Employee {employee.username} {status}')
         else:
@@ -1215,6 +1216,7 @@ def delete_employee(employee_id):
             
             db.session.delete(employee)
             db.session.commit()
+            employee_dashboard_bp.invalidate_employee_session_cache(employee_id)
             flash(f'Employee {username} deleted successfully')
         else:
             flash('Employee model not available')
@@ -1250,9 +1252,9 @@ def send_admin_otp():
             db.session.rollback()
         
         # Generate OTP
-        otp = f"{secrets.randbelow(1_000_000):06d}"
-        salt = os.urandom(16)
-        otp_hash = hashlib.sha256(salt + otp.encode()).hexdigest()
+        otp = generate_otp()
+        salt = generate_otp_salt()
+        otp_hash = hash_otp(otp, salt)
         expires_at = datetime.utcnow() + timedelta(minutes=5)
         
         # Save OTP to database - ensure we're using the correct AdminOTP model
@@ -1331,10 +1333,7 @@ def verify_otp():
             return redirect(url_for('admin.login'))
         
         # Verify OTP
-        salt = bytes.fromhex(admin_otp.salt)
-        otp_hash = hashlib.sha256(salt + otp_input.encode()).hexdigest()
-        
-        if otp_hash == admin_otp.otp_hash:
+        if verify_otp_hash(otp_input, admin_otp.salt, admin_otp.otp_hash):
             # Mark OTP as used
             admin_otp.used = True
             db.session.commit()
@@ -1,10 +1,23 @@
 import os
-import secrets
-import hashlib
 import time
+import atexit
 import logging
+import logging.handlers
+import queue
 # Configure logging
 logging.basicConfig(level=logging.INFO)
+
+# Request-path loggers hand records to a queue; a listener thread writes them
+_log_queue = queue.Queue(-1)
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_stream_handler)
+for _logger_name in ('employee_dashboard', 'email_service'):
+    _queued_logger = logging.getLogger(_logger_name)
+    _queued_logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+    _queued_logger.propagate = False
+_log_listener.start()
+atexit.register(_log_listener.stop)
 from datetime import datetime, timedelta
 from functools import wraps
 from typing import Optional, Tuple
@@ -242,7 +255,7 @@ except Exception as e:
 # ------------------------------------------------------------------------------
 # Mail (Gmail SMTP) configuration - Dual Email Setup
 # ------------------------------------------------------------------------------
-from email_service import EmailService, email_service
+from email_service import EmailService, email_service, generate_otp, generate_otp_salt, hash_otp, verify_otp_hash
 
 # Initialize dual email service
 email_service.init_app(app)
@@ -324,6 +337,11 @@ class User(UserMixin, db.Model):
     subscription_expires = db.Column(db.DateTime, nullable=True)
     subscription_type = db.Column(db.String(20), nullable=True)  # 'monthly' or 'yearly'
 
+    # Employee dashboard lists users newest first (see add_user_registered_on_index)
+    __table_args__ = (
+        db.Index('ix_users_registered_on', registered_on.desc()),
+    )
+
     def set_password(self, password: str):
         self.password_hash = generate_password_hash(password)
 
@@ -1220,9 +1238,9 @@ def issue_reset_otp(email: str) -> None:
     except Exception:
         db.session.rollback()
 
-    otp = f"{secrets.randbelow(1_000_000):06d}"
-    salt = os.urandom(16)
-    digest = hashlib.sha256(salt + otp.encode()).hexdigest()
+    otp = generate_otp()
+    salt = generate_otp_salt()
+    digest = hash_otp(otp, salt)
     expires_at = datetime.now(timezone.utc) + timedelta(minutes=10)  # Extended to 10 minutes
 
     rec = ResetOTP(
@@ -1279,9 +1297,7 @@ def verify_reset_otp(email: str, otp_input: str) -> Tuple[bool, str, Optional[Re
     if rec.is_expired():
         return False, "Code expired. Request a new code.", rec
 
-    salt = bytes.fromhex(rec.salt)
-    calc = hashlib.sha256(salt + otp_input.encode()).hexdigest()
-    if calc != rec.otp_hash:
+    if not verify_otp_hash(otp_input, rec.salt, rec.otp_hash):
         rec.attempts += 1
         db.session.commit()
         return False, "Incorrect code.", rec
@@ -1295,9 +1311,9 @@ def issue_signup_otp(email: str) -> None:
     except Exception:
         db.session.rollback()
 
-    otp = f"{secrets.randbelow(1_000_000):06d}"
-    salt = os.urandom(16)
-    digest = hashlib.sha256(salt + otp.encode()).hexdigest()
+    otp = generate_otp()
+    salt = generate_otp_salt()
+    digest = hash_otp(otp, salt)
     expires_at = datetime.now(timezone.utc) + timedelta(minutes=10)  # Extended to 10 minutes
 
     rec = EmailVerifyOTP(
@@ -1362,9 +1378,7 @@ def verify_signup_otp(email: str, otp_input: str) -> Tuple[bool, str, Optional[E
     if rec.is_expired():
         return False, "Code expired. Request a new code.", rec
 
-    salt = bytes.fromhex(rec.salt)
-    calc = hashlib.sha256(salt + otp_input.encode()).hexdigest()
-    if calc != rec.otp_hash:
+    if not verify_otp_hash(otp_input, rec.salt, rec.otp_hash):
         rec.attempts += 1
         db.session.commit()
         return False, "Incorrect code.", rec
@@ -2170,9 +2184,9 @@ def issue_delete_account_otp(email: str) -> None:
     except Exception:
         db.session.rollback()
 
-    otp = f"{secrets.randbelow(1_000_000):06d}"
-    salt = os.urandom(16)
-    digest = hashlib.sha256(salt + otp.encode()).hexdigest()
+    otp = generate_otp()
+    salt = generate_otp_salt()
+    digest = hash_otp(otp, salt)
     expires_at = datetime.now(timezone.utc) + timedelta(minutes=10)
 
     rec = DeleteAccountOTP(
@@ -2239,9 +2253,7 @@ def verify_delete_account_otp(email: str, otp_input: str) -> Tuple[bool, str, Op
     if rec.is_expired():
         return False, "Code expired. Request a new code.", rec
 
-    salt = bytes.fromhex(rec.salt)
-    calc = hashlib.sha256(salt + otp_input.encode()).hexdigest()
-    if calc != rec.otp_hash:
+    if not verify_otp_hash(otp_input, rec.salt, rec.otp_hash):
         rec.attempts += 1
         db.session.commit()
         return False, "Incorrect code.", rec
@@ -19,6 +19,8 @@ def get_database_engine_options():
     return {
         "pool_pre_ping": True,
         "pool_recycle": 300,
+        # Room for the app's many distinct text()/ORM statements in the compiled cache
+        "query_cache_size": 500,
         "connect_args": {
             "options": "-c timezone=UTC",
             "client_encoding": "utf8"
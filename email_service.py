@@ -1,10 +1,79 @@
 # Email Service with Dual Configuration
 import os
+import logging
 import secrets
 import hashlib
+import hmac
+import smtplib
+import threading
+from contextlib import nullcontext
 from datetime import datetime, timezone, timedelta
-from flask_mail import Mail, Message
-from flask import current_app
+from flask_mail import Mail, Message, Connection
+from flask import current_app, has_app_context
+
+logger = logging.getLogger('email_service')
+
+class ReusableConnection(Connection):
+    """flask_mail connection that hands its SMTP session back to the owning
+    Mail instance on exit instead of quitting it"""
+
+    def __init__(self, mail, owner):
+        super().__init__(mail)
+        self.owner = owner
+
+    def configure_host(self):
+        host = self.owner._take_host()
+        return host if host is not None else super().configure_host()
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if self.host is None:
+            return
+        if exc_type is None:
+            self.owner._release_host(self.host)
+        else:
+            self.host.close()
+
+
+class ReusableMail(Mail):
+    """Mail that keeps one authenticated smtplib.SMTP session open between
+    sends, so an OTP email does not pay for connect, STARTTLS and AUTH"""
+
+    def __init__(self, app=None):
+        self._host = None
+        self._host_lock = threading.Lock()
+        super().__init__(app)
+
+    def _take_host(self):
+        with self._host_lock:
+            host, self._host = self._host, None
+        if host is None:
+            return None
+        try:
+            # The server may have dropped an idle session
+            if host.noop()[0] == 250:
+                return host
+        except (smtplib.SMTPException, OSError):
+            pass
+        host.close()
+        return None
+
+    def _release_host(self, host):
+        with self._host_lock:
+            if self._host is None:
+                self._host = host
+                return
+        try:
+            host.quit()
+        except (smtplib.SMTPException, OSError):
+            host.close()
+
+    def connect(self):
+        """Opens a connection that reuses the cached SMTP session."""
+        app = getattr(self, "app", None) or current_app
+        try:
+            return ReusableConnection(app.extensions['mail'], self)
+        except KeyError:
+            raise RuntimeError("The current application was not configured with Flask-Mail")
 
 class EmailService:
     def __init__(self, app=None):
@@ -46,8 +115,8 @@ class EmailService:
         }
         
         # Create separate Mail instances
-        self.admin_mail = Mail()
-        self.user_mail = Mail()
+        self.admin_mail = ReusableMail()
+        self.user_mail = ReusableMail()
         
         # Configure admin mail
         for key, value in admin_config.items():
@@ -57,10 +126,14 @@ class EmailService:
         for key, value in user_config.items():
             app.config[f'USER_{key}'] = value
     
+    def _app_context(self):
+        """Reuse the active app context (e.g. inside a request) instead of pushing a new one"""
+        return nullcontext() if has_app_context() else self.app.app_context()
+    
     def send_admin_email(self, to, subject, html, body=None):
         """Send email to admin using admin configuration"""
         try:
-            with self.app.app_context():
+            with self._app_context():
                 # Temporarily set admin config
                 original_config = {}
                 admin_keys = ['MAIL_SERVER', 'MAIL_PORT', 'MAIL_USE_TLS', 'MAIL_USERNAME', 'MAIL_PASSWORD', 'MAIL_DEFAULT_SENDER']
@@ -79,17 +152,17 @@ class EmailService:
                         self.app.config[key] = value
                     else:
                         self.app.config.pop(key, None)
-                        
-                print(f"[ADMIN EMAIL] Successfully sent to: {to}")
                 
-        except Exception as e:
-            print(f"[ADMIN EMAIL] Failed to send to {to}: {str(e)}")
+                logger.info("[ADMIN EMAIL] Successfully sent to: %s", to)
+                
+        except Exception:
+            logger.exception("[ADMIN EMAIL] Failed to send to %s", to)
             raise
     
     def send_user_email(self, to, subject, html, body=None):
         """Send email to users using user configuration"""
         try:
-            with self.app.app_context():
+            with self._app_context():
                 # Temporarily set user config
                 original_config = {}
                 user_keys = ['MAIL_SERVER', 'MAIL_PORT', 'MAIL_USE_TLS', 'MAIL_USERNAME', 'MAIL_PASSWORD', 'MAIL_DEFAULT_SENDER']
@@ -108,26 +181,41 @@ class EmailService:
                         self.app.config[key] = value
                     else:
                         self.app.config.pop(key, None)
-                        
-                print(f"[USER EMAIL] Successfully sent to: {to}")
                 
-        except Exception as e:
-            print(f"[USER EMAIL] Failed to send to {to}: {str(e)}")
+                logger.info("[USER EMAIL] Successfully sent to: %s", to)
+                
+        except Exception:
+            logger.exception("[USER EMAIL] Failed to send to %s", to)
             raise
 
 # Global email service instance
 email_service = EmailService()
 
+OTP_SALT_BYTES = 32
+
+# OTPs are hashed with keyed BLAKE2b. Hashes issued before the switch were
+# salted SHA-256; keep accepting them until those OTPs have all expired,
+# then set OTP_HASH_ACCEPT_SHA256=0.
+OTP_HASH_ACCEPT_SHA256 = os.environ.get('OTP_HASH_ACCEPT_SHA256', '1') == '1'
+
 def generate_otp():
     """Generate 6-digit OTP"""
     return f"{secrets.randbelow(1_000_000):06d}"
 
+def generate_otp_salt():
+    """Generate a random salt for hashing an OTP"""
+    return secrets.token_bytes(OTP_SALT_BYTES)
+
 def hash_otp(otp, salt):
     """Hash OTP with salt"""
-    return hashlib.sha256(salt + otp.encode()).hexdigest()
+    return hashlib.blake2b(otp.encode(), key=salt, digest_size=32).hexdigest()
 
 def verify_otp_hash(otp, salt_hex, stored_hash):
     """Verify OTP against stored hash"""
-    salt = bytes.fromhex(salt_hex)
-    calculated_hash = hashlib.sha256(salt + otp.encode()).hexdigest()
-    return calculated_hash == stored_hash
\ No newline at end of file
+    calculated_hash = hash_otp(otp, bytes.fromhex(salt_hex))
+    if hmac.compare_digest(calculated_hash, stored_hash):
+        return True
+    if OTP_HASH_ACCEPT_SHA256:
+        legacy_hash = hashlib.sha256(bytes.fromhex(salt_hex) + otp.encode()).hexdigest()
+        return hmac.compare_digest(legacy_hash, stored_hash)
+    return False
\ No newline at end of file
@@ -33,7 +33,7 @@ def create_employee_models(database):
         created_by = database.Column(database.String(80), nullable=False)
         created_at = database.Column(database.DateTime, default=datetime.utcnow)
         
-        role = database.relationship('EmpRole', backref='employees')
+        role = database.relationship('EmpRole', backref='employees', lazy='joined')
     
     class AuditLog(database.Model):
         __tablename__ = 'audit_log'
@@ -1,13 +1,49 @@
 from flask import Blueprint, render_template, request, jsonify, abort, flash, session, redirect, url_for
 from flask_login import login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import text
 from datetime import datetime, timedelta
 from functools import wraps
+from operator import itemgetter
+from collections import deque
 import json
+import logging
+import os
+import time
+import uuid
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger('employee_dashboard')
 
 # Create blueprint
 employee_dashboard_bp = Blueprint('employee_dashboard', __name__, url_prefix='/employee', template_folder='templates/employee_dashboard')
 
+# SQL statements used by the dashboard routes, built once at import
+_USER_COUNTS_SQL = text("SELECT COUNT(*) AS total, COALESCE(SUM(CASE WHEN verified = 1 THEN 1 ELSE 0 END), 0) AS active FROM user")
+_RECENT_USERS_SQL = text("SELECT id, email, name, verified, registered_on FROM user ORDER BY registered_on DESC LIMIT 10")
+_USERS_SEARCH_SQL = text("SELECT id, email, name, verified, subscription_active, registered_on, COUNT(*) OVER () AS total_rows FROM user WHERE email LIKE :search ORDER BY registered_on DESC LIMIT :limit OFFSET :offset")
+_USERS_LIST_SQL = text("SELECT id, email, name, verified, subscription_active, registered_on, COUNT(*) OVER () AS total_rows FROM user ORDER BY registered_on DESC LIMIT :limit OFFSET :offset")
+_USER_DETAIL_SQL = text("SELECT id, email, name, verified, subscription_active, registered_on FROM user WHERE id = :user_id")
+_USER_DETAIL_WITH_SESSIONS_SQL = text(
+    "SELECT u.id, u.email, u.name, u.verified, u.subscription_active, u.registered_on, "
+    "s.session_token, s.ip_address, s.user_agent, s.is_active, s.created_at, s.last_activity "
+    "FROM user u LEFT JOIN emp_user_session s ON s.user_id = u.id "
+    "WHERE u.id = :user_id ORDER BY s.last_activity DESC LIMIT 5"
+)
+_TOGGLE_USER_SQL = text("UPDATE user SET verified = NOT verified WHERE id = :user_id RETURNING verified, email")
+_DISABLE_LOGIN_SQL = text("UPDATE user SET verified = 0 WHERE id = :user_id RETURNING email")
+_ACTIVE_SESSIONS_SQL = text("SELECT session_token, user_id, ip_address, user_agent, is_active, created_at, last_activity FROM emp_user_session WHERE is_active = 1 ORDER BY last_activity DESC")
+
+# Column layouts of the user/session queries above, for row -> dict conversion
+_USER_FIELDS = ('id', 'email', 'name', 'verified', 'subscription_active', 'registered_on')
+_SESSION_FIELDS = ('session_token', 'ip_address', 'user_agent', 'is_active', 'created_at', 'last_activity')
+_get_user_fields = itemgetter(*range(len(_USER_FIELDS)))
+_get_session_fields = itemgetter(*range(len(_USER_FIELDS), len(_USER_FIELDS) + len(_SESSION_FIELDS)))
+
 # Global variables - set when blueprint is registered
 db = None
 User = None
@@ -41,11 +77,14 @@ def create_employee_dashboard_models(database):
         created_at = database.Column(database.DateTime, default=datetime.utcnow)
         created_by = database.Column(database.String(80), default='admin')
         
-        role = database.relationship('EmpRole', backref='employees')
+        role = database.relationship('EmpRole', backref='employees', lazy='joined')
 
     class AuditLog(database.Model):
         __tablename__ = 'emp_audit_log'
-        __table_args__ = {'extend_existing': True}
+        __table_args__ = (
+            database.Index('ix_audit_timestamp_id', 'timestamp', 'id'),
+            {'extend_existing': True}
+        )
         id = database.Column(database.Integer, primary_key=True)
         actor_id = database.Column(database.Integer, database.ForeignKey('emp_dashboard_employee.id'), nullable=False)
         action = database.Column(database.String(100), nullable=False)
@@ -78,29 +117,90 @@ def create_employee_dashboard_models(database):
     
     return User, EmployeeDashboard, EmpRole, AuditLog, UserSession
 
-# Rate limiting storage (in production, use Redis)
+# Rate limiting: Redis sorted sets when REDIS_URL is configured, otherwise
+# a bounded per-process deque of timestamps per key
+# Sliding window as one Lua script, so the trim, count and add are atomic
+# across workers. Rejected attempts are not recorded, so the window can drain
+# while a client retries.
+_RATE_LIMIT_LUA = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, now - window)
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now, ARGV[4])
+redis.call('EXPIRE', KEYS[1], window)
+return 1
+"""
+
+_redis_client = None
+_rate_limit_script = None
+if redis is not None and os.environ.get('REDIS_URL'):
+    try:
+        _redis_client = redis.Redis.from_url(os.environ['REDIS_URL'])
+        _rate_limit_script = _redis_client.register_script(_RATE_LIMIT_LUA)
+    except Exception as e:
+        logger.warning("Redis unavailable for rate limiting: %s", e)
+        _redis_client = None
+
 rate_limit_store = {}
 
+def _check_rate_limit_redis(key, limit, window):
+    allowed = _rate_limit_script(
+        keys=[f"rate_limit:{key}"],
+        args=[time.time(), int(window), limit, uuid.uuid4().hex],
+    )
+    return bool(allowed)
+
 def check_rate_limit(employee_id, action, limit=30, window=60):
     """Check if employee has exceeded rate limit"""
-    now = datetime.utcnow()
     key = f"{employee_id}:{action}"
     
-    if key not in rate_limit_store:
-        rate_limit_store[key] = []
+    if _redis_client is not None:
+        try:
+            return _check_rate_limit_redis(key, limit, window)
+        except Exception as e:
+            logger.warning("Redis rate limit check failed, using in-process store: %s", e)
     
-    # Clean old entries
-    rate_limit_store[key] = [
-        timestamp for timestamp in rate_limit_store[key]
-        if now - timestamp < timedelta(seconds=window)
-    ]
+    now = time.monotonic()
+    timestamps = rate_limit_store.get(key)
+    if timestamps is None or timestamps.maxlen != limit:
+        timestamps = rate_limit_store[key] = deque(maxlen=limit)
     
-    if len(rate_limit_store[key]) >= limit:
+    # The deque holds at most `limit` entries, so only the oldest needs checking
+    if len(timestamps) >= limit and now - timestamps[0] < window:
         return False
     
-    rate_limit_store[key].append(now)
+    timestamps.append(now)
     return True
 
+# How long a verified employee role/status is trusted from the session
+EMPLOYEE_CHECK_TTL = timedelta(seconds=60)
+_employee_invalidated_at = {}
+
+def invalidate_employee_session_cache(employee_id):
+    """Force the next request from this employee to re-check the database"""
+    _employee_invalidated_at[employee_id] = datetime.utcnow()
+
+def _cache_employee_check(employee):
+    session['employee_role'] = employee.role.name
+    session['employee_active_until'] = (datetime.utcnow() + EMPLOYEE_CHECK_TTL).isoformat()
+
+def _employee_check_cached(employee_id, roles):
+    """True if the session holds a fresh, still-valid role check for these roles"""
+    active_until = session.get('employee_active_until')
+    if not active_until or session.get('employee_role') not in roles:
+        return False
+    try:
+        active_until = datetime.fromisoformat(active_until)
+    except ValueError:
+        return False
+    if active_until <= datetime.utcnow():
+        return False
+    invalidated_at = _employee_invalidated_at.get(employee_id)
+    return invalidated_at is None or invalidated_at < active_until - EMPLOYEE_CHECK_TTL
+
 def require_employee_role(*roles):
     """Decorator to check employee role permissions"""
     def wrapper(f):
@@ -110,15 +210,20 @@ def require_employee_role(*roles):
                 return redirect(url_for('employee_dashboard.employee_login'))
             
             employee_id = session.get('employee_id')
-            if EmployeeDashboard:
-                employee = EmployeeDashboard.query.get(employee_id)
-                if not employee or not employee.is_active or not employee.can_login:
-                    flash('Account disabled', 'error')
-                    return redirect(url_for('employee_dashboard.employee_login'))
-                
-                if employee.role.name not in roles:
-                    flash('Insufficient permissions', 'error')
-                    return redirect(url_for('employee_dashboard.dashboard'))
+            if _employee_check_cached(employee_id, roles):
+                return f(*args, **kwargs)
+            
+            # Models are bound by init_employee_dashboard_db before any request
+            employee = EmployeeDashboard.query.get(employee_id)
+            if not employee or not employee.is_active or not employee.can_login:
+                session.pop('employee_active_until', None)
+                flash('Account disabled', 'error')
+                return redirect(url_for('employee_dashboard.employee_login'))
+            
+            _cache_employee_check(employee)
+            if employee.role.name not in roles:
+                flash('Insufficient permissions', 'error')
+                return redirect(url_for('employee_dashboard.dashboard'))
             
             return f(*args, **kwargs)
         return wrapped
@@ -155,11 +260,10 @@ def employee_login():
             session['employee_logged_in'] = True
             session['employee_id'] = employee.id
             session['employee_name'] = employee.full_name
-            session['employee_role'] = employee.role.name
+            _cache_employee_check(employee)
             
+            # Committed together with the audit row by log_audit
             employee.last_login = datetime.utcnow()
-            db.session.commit()
-            
             log_audit('employee_login', 'employee', employee.id)
             return redirect(url_for('employee_dashboard.dashboard'))
         else:
@@ -181,36 +285,21 @@ def employee_logout():
 def dashboard():
     try:
         # Use direct SQL queries to get user counts
-        from sqlalchemy import text
-        
-        # Get total users
-        result = db.session.execute(text("SELECT COUNT(*) FROM user")).fetchone()
-        total_users = result[0] if result else 0
-        
-        # Get active users (verified)
-        result = db.session.execute(text("SELECT COUNT(*) FROM user WHERE verified = 1")).fetchone()
-        active_users = result[0] if result else 0
+        # Get total and active (verified) users in a single scan
+        result = db.session.execute(_USER_COUNTS_SQL).fetchone()
+        total_users, active_users = (result[0], result[1]) if result else (0, 0)
         
         # Get inactive users
         inactive_users = total_users - active_users
         
         # Get recent users for display
-        result = db.session.execute(
-            text("SELECT id, email, name, verified, registered_on FROM user ORDER BY registered_on DESC LIMIT 10")
-        )
-        recent_users = []
-        for row in result:
-            user_dict = {
-                'id': row[0],
-                'email': row[1],
-                'name': row[2],
-                'verified': bool(row[3]),
-                'registered_on': row[4]
-            }
-            recent_users.append(user_dict)
+        recent_users = [
+            {**row, 'verified': bool(row['verified'])}
+            for row in db.session.execute(_RECENT_USERS_SQL).mappings()
+        ]
         
-    except Exception as e:
-        print(f"Error fetching user data: {e}")
+    except Exception:
+        logger.exception("Error fetching user data")
         total_users = 0
         active_users = 0
         inactive_users = 0
@@ -222,40 +311,33 @@ def dashboard():
                          inactive_users=inactive_users,
                          recent_users=recent_users)
 
+USERS_PER_PAGE = 100
+
 @employee_dashboard_bp.route('/users')
 @require_employee_role('employee', 'admin', 'owner')
 def users_list():
+    search = request.args.get('q', '')
+    page = max(request.args.get('page', 1, type=int), 1)
     try:
-        from sqlalchemy import text
-        search = request.args.get('q', '')
-        
+        params = {'limit': USERS_PER_PAGE, 'offset': (page - 1) * USERS_PER_PAGE}
         if search:
-            result = db.session.execute(
-                text("SELECT id, email, name, verified, subscription_active, registered_on FROM user WHERE email LIKE :search ORDER BY registered_on DESC"),
-                {'search': f'%{search}%'}
-            )
+            params['search'] = f'%{search}%'
+            result = db.session.execute(_USERS_SEARCH_SQL, params)
         else:
-            result = db.session.execute(
-                text("SELECT id, email, name, verified, subscription_active, registered_on FROM user ORDER BY registered_on DESC")
-            )
+            result = db.session.execute(_USERS_LIST_SQL, params)
         
-        users = []
-        for row in result:
-            user_dict = {
-                'id': row[0],
-                'email': row[1],
-                'name': row[2],
-                'verified': bool(row[3]),
-                'subscription_active': bool(row[4]),
-                'registered_on': row[5]
-            }
-            users.append(user_dict)
+        # RowMapping supports the same key/attribute access in templates as a dict
+        users = result.mappings().all()
+        total = users[0]['total_rows'] if users else 0
             
-    except Exception as e:
-        print(f"Error fetching users: {e}")
+    except Exception:
+        logger.exception("Error fetching users")
         users = []
+        total = 0
     
-    return render_template('employee_users_simple.html', users=users, search=search)
+    pages = (total + USERS_PER_PAGE - 1) // USERS_PER_PAGE
+    return render_template('employee_users_simple.html', users=users, search=search,
+                           page=page, pages=pages, total=total)
 
 @employee_dashboard_bp.route('/manage/<int:user_id>')
 @require_employee_role('employee', 'admin', 'owner')
@@ -266,48 +348,32 @@ def manage_user(user_id):
 @require_employee_role('employee', 'admin', 'owner')
 def user_detail(user_id):
     try:
-        from sqlalchemy import text
-        
-        # Get user details
-        result = db.session.execute(
-            text("SELECT id, email, name, verified, subscription_active, registered_on FROM user WHERE id = :user_id"),
-            {'user_id': user_id}
-        ).fetchone()
+        # Get user details and recent sessions in one query; fall back to the
+        # user row alone if the UserSession table does not exist
+        try:
+            rows = db.session.execute(_USER_DETAIL_WITH_SESSIONS_SQL, {'user_id': user_id}).fetchall()
+        except Exception:
+            db.session.rollback()
+            rows = db.session.execute(_USER_DETAIL_SQL, {'user_id': user_id}).fetchall()
         
-        if not result:
+        if not rows:
             abort(404)
         
-        user = {
-            'id': result[0],
-            'email': result[1],
-            'name': result[2],
-            'verified': bool(result[3]),
-            'subscription_active': bool(result[4]),
-            'registered_on': result[5]
-        }
+        user = dict(zip(_USER_FIELDS, _get_user_fields(rows[0])))
+        user['verified'] = bool(user['verified'])
+        user['subscription_active'] = bool(user['subscription_active'])
         
-        # Get user sessions if UserSession table exists
         sessions = []
-        try:
-            session_result = db.session.execute(
-                text("SELECT session_token, ip_address, user_agent, is_active, created_at, last_activity FROM emp_user_session WHERE user_id = :user_id ORDER BY last_activity DESC LIMIT 5"),
-                {'user_id': user_id}
-            )
-            for row in session_result:
-                session_dict = {
-                    'session_token': row[0],
-                    'ip_address': row[1],
-                    'user_agent': row[2],
-                    'is_active': bool(row[3]),
-                    'created_at': row[4],
-                    'last_activity': row[5]
-                }
+        if len(rows[0]) > len(_USER_FIELDS):
+            for row in rows:
+                if row[len(_USER_FIELDS)] is None:
+                    continue
+                session_dict = dict(zip(_SESSION_FIELDS, _get_session_fields(row)))
+                session_dict['is_active'] = bool(session_dict['is_active'])
                 sessions.append(session_dict)
-        except:
-            sessions = []
         
-    except Exception as e:
-        print(f"Error fetching user details: {e}")
+    except Exception:
+        logger.exception("Error fetching user details")
         abort(404)
     
     return render_template('employee_user_detail.html', user=user, sessions=sessions)
@@ -317,26 +383,15 @@ def user_detail(user_id):
 @require_employee_role('employee', 'admin', 'owner')
 def api_toggle_user(user_id):
     try:
-        from sqlalchemy import text
-        
-        # Get current user status
-        result = db.session.execute(
-            text("SELECT verified, email FROM user WHERE id = :user_id"), 
-            {'user_id': user_id}
-        ).fetchone()
+        # Flip user status and read back the new value in one statement
+        result = db.session.execute(_TOGGLE_USER_SQL, {'user_id': user_id}).fetchone()
         
         if not result:
+            db.session.rollback()
             return jsonify({'error': 'User not found'}), 404
         
-        current_verified = bool(result[0])
+        new_verified = bool(result[0])
         email = result[1]
-        new_verified = not current_verified
-        
-        # Update user status
-        db.session.execute(
-            text("UPDATE user SET verified = :verified WHERE id = :user_id"),
-            {'verified': new_verified, 'user_id': user_id}
-        )
         db.session.commit()
         
         return jsonify({
@@ -355,26 +410,16 @@ def api_disable_login(user_id):
         return jsonify({'error': 'Rate limit exceeded'}), 429
     
     try:
-        from sqlalchemy import text
-        
-        # Get user email for logging
-        result = db.session.execute(
-            text("SELECT email FROM user WHERE id = :user_id"),
-            {'user_id': user_id}
-        ).fetchone()
+        # Disable user login by setting verified to False; email is returned for logging
+        result = db.session.execute(_DISABLE_LOGIN_SQL, {'user_id': user_id}).fetchone()
         
         if not result:
+            db.session.rollback()
             return jsonify({'error': 'User not found'}), 404
         
         user_email = result[0]
         
-        # Disable user login by setting verified to False
-        db.session.execute(
-            text("UPDATE user SET verified = 0 WHERE id = :user_id"),
-            {'user_id': user_id}
-        )
-        db.session.commit()
-        
+        # The UPDATE and the audit row are committed together by log_audit
         log_audit('disable_user_login', 'user', user_id, {
             'user_email': user_email
         })
@@ -385,48 +430,53 @@ def api_disable_login(user_id):
         })
         
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @employee_dashboard_bp.route('/sessions')
 @require_employee_role('employee', 'admin', 'owner')
 def active_sessions():
     try:
-        from sqlalchemy import text
-        result = db.session.execute(
-            text("SELECT session_token, user_id, ip_address, user_agent, is_active, created_at, last_activity FROM emp_user_session WHERE is_active = 1 ORDER BY last_activity DESC")
-        )
-        sessions = []
-        for row in result:
-            session_dict = {
-                'session_token': row[0],
-                'user_id': row[1],
-                'ip_address': row[2],
-                'user_agent': row[3],
-                'is_active': bool(row[4]),
-                'created_at': row[5],
-                'last_activity': row[6]
-            }
-            sessions.append(session_dict)
-    except Exception as e:
-        print(f"Error fetching sessions: {e}")
+        sessions = db.session.execute(_ACTIVE_SESSIONS_SQL).mappings().all()
+    except Exception:
+        logger.exception("Error fetching sessions")
         sessions = []
     
     return render_template('employee_sessions.html', sessions=sessions)
 
+AUDIT_PER_PAGE = 50
+
+def _audit_cursor(row):
+    """`before` value for the page after `row`: its timestamp and id, comma-separated"""
+    timestamp = row['timestamp']
+    if hasattr(timestamp, 'isoformat'):
+        timestamp = timestamp.isoformat()
+    return f"{timestamp},{row['id']}"
+
+def _parse_audit_cursor(value):
+    """(timestamp, id) from an _audit_cursor value, or None if missing or malformed"""
+    timestamp, _, audit_id = value.rpartition(',')
+    try:
+        return datetime.fromisoformat(timestamp), int(audit_id)
+    except ValueError:
+        return None
+
 @employee_dashboard_bp.route('/audit')
 @require_employee_role('admin', 'owner')  # Only admin and owner can view full audit
 def audit_log():
+    actor_filter = request.args.get('actor', '')
+    action_filter = request.args.get('action', '')
+    cursor = _parse_audit_cursor(request.args.get('before', ''))
+    audits_paginated = None
     try:
-        from sqlalchemy import text
-        page = request.args.get('page', 1, type=int)
-        actor_filter = request.args.get('actor', '')
-        action_filter = request.args.get('action', '')
-        per_page = 50
-        offset = (page - 1) * per_page
-        
-        # Build query with filters
+        # Keyset pagination: seek past the last (timestamp, id) of the previous
+        # page instead of counting and skipping rows with OFFSET
         where_conditions = []
-        params = {'limit': per_page, 'offset': offset}
+        params = {'limit': AUDIT_PER_PAGE + 1}
+        
+        if cursor:
+            where_conditions.append("(a.timestamp, a.id) < (:cursor_timestamp, :cursor_id)")
+            params['cursor_timestamp'], params['cursor_id'] = cursor
         
         if actor_filter:
             where_conditions.append("e.full_name LIKE :actor_filter")
@@ -440,64 +490,40 @@ def audit_log():
         if where_clause:
             where_clause = 'WHERE ' + where_clause
         
-        # Get audit logs
+        # One extra row tells whether another page follows
         query = f"""
-            SELECT a.id, a.actor_id, a.action, a.target_type, a.target_id, a.meta, a.ip_address, a.timestamp, e.full_name
+            SELECT a.id, a.actor_id, a.action, a.target_type, a.target_id, a.meta, a.ip_address, a.timestamp,
+                   e.full_name AS actor_name
             FROM emp_audit_log a
             LEFT JOIN emp_dashboard_employee e ON a.actor_id = e.id
             {where_clause}
-            ORDER BY a.timestamp DESC
-            LIMIT :limit OFFSET :offset
+            ORDER BY a.timestamp DESC, a.id DESC
+            LIMIT :limit
         """
         
-        result = db.session.execute(text(query), params)
-        audits = []
-        for row in result:
-            audit_dict = {
-                'id': row[0],
-                'actor_id': row[1],
-                'action': row[2],
-                'target_type': row[3],
-                'target_id': row[4],
-                'meta': row[5],
-                'ip_address': row[6],
-                'timestamp': row[7],
-                'actor_name': row[8]
-            }
-            audits.append(audit_dict)
-        
-        # Get total count for pagination
-        count_query = f"""
-            SELECT COUNT(*)
-            FROM emp_audit_log a
-            LEFT JOIN emp_dashboard_employee e ON a.actor_id = e.id
-            {where_clause}
-        """
-        total = db.session.execute(text(count_query), {k: v for k, v in params.items() if k not in ['limit', 'offset']}).fetchone()[0]
+        audits = db.session.execute(text(query), params).mappings().all()
         
         # Create pagination object-like structure
-        class PaginationMock:
-            def __init__(self, items, page, per_page, total):
-                self.items = items
-                self.page = page
+        class CursorPage:
+            def __init__(self, rows, per_page, is_first):
+                self.items = rows[:per_page]
                 self.per_page = per_page
-                self.total = total
-                self.pages = (total + per_page - 1) // per_page
-                self.has_prev = page > 1
-                self.has_next = page < self.pages
-                self.prev_num = page - 1 if self.has_prev else None
-                self.next_num = page + 1 if self.has_next else None
+                self.has_prev = not is_first
+                self.has_next = len(rows) > per_page
+                self.next_cursor = _audit_cursor(self.items[-1]) if self.has_next else None
         
-        audits_paginated = PaginationMock(audits, page, per_page, total)
+        audits_paginated = CursorPage(audits, AUDIT_PER_PAGE, cursor is None)
         
-    except Exception as e:
-        print(f"Error fetching audit logs: {e}")
-        audits_paginated = None
+    except Exception:
+        logger.exception("Error fetching audit logs")
     
-    return render_template('employee_audit.html', audits=audits_paginated, actor_filter=actor_filter, action_filter=action_filter)
+    return render_template('employee_audit.html', audits=audits_paginated,
+                           next_cursor=audits_paginated.next_cursor if audits_paginated else None,
+                           actor_filter=actor_filter, action_filter=action_filter)
 
-def init_employee_dashboard_db(app_db):
-    """Initialize employee dashboard database models"""
+def init_employee_dashboard_db(app_db, commit=True):
+    """Initialize employee dashboard database models. With commit=False the
+    default roles are left pending for the caller to commit."""
     global db, User, EmployeeDashboard, EmpRole, AuditLog, UserSession
     db = app_db
     User, EmployeeDashboard, EmpRole, AuditLog, UserSession = create_employee_dashboard_models(db)
@@ -515,5 +541,6 @@ def init_employee_dashboard_db(app_db):
         ]
         for role in roles:
             db.session.add(role)
-        db.session.commit()
-        print("Default roles created")
\ No newline at end of file
+        if commit:
+            db.session.commit()
+        logger.info("Default roles created")
\ No newline at end of file
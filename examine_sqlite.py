@@ -4,42 +4,61 @@ Examine the all_symbol.db SQLite database to understand its structure
 """
 
 import sqlite3
+from collections import defaultdict
+from operator import itemgetter
+
+def sql_order(value):
+    """Sort key matching SQLite's ORDER BY: NULLs first, then numbers, then text"""
+    return (value is not None, isinstance(value, str), value)
+
+def by_count(totals):
+    """(key, count) pairs from a totals dict, largest count first"""
+    return sorted(totals.items(), key=itemgetter(1), reverse=True)
 
 def examine_sqlite():
     """Examine the SQLite database in detail"""
     try:
-        conn = sqlite3.connect('all_symbol.db')
+        # Inspection only: open read-only so no lock file or journal syncs are involved
+        conn = sqlite3.connect('file:all_symbol.db?mode=ro', uri=True)
+        conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
+        cursor.execute("PRAGMA query_only=1;")
+        cursor.execute("PRAGMA temp_store=MEMORY;")
+        cursor.execute("PRAGMA cache_size=-65536;")
+        
+        # One scan grouped by (exchange, segment); every summary below is derived from it
+        cursor.execute("SELECT EXCH_ID, SEGMENT, COUNT(*) FROM instruments GROUP BY EXCH_ID, SEGMENT;")
+        pair_counts = cursor.fetchall()
+        
+        exchange_totals = defaultdict(int)
+        segment_totals = defaultdict(int)
+        nse_segment_totals = defaultdict(int)
+        for ex, seg, count in pair_counts:
+            exchange_totals[ex] += count
+            segment_totals[seg] += count
+            if ex == 'NSE':
+                nse_segment_totals[seg] += count
+        
         
         # Get unique exchange values
-        cursor.execute("SELECT DISTINCT EXCH_ID FROM instruments ORDER BY EXCH_ID;")
-        exchanges = cursor.fetchall()
-        print(f"[INFO] Unique exchanges: {[ex[0] for ex in exchanges]}")
+        print(f"[INFO] Unique exchanges: {sorted(exchange_totals, key=sql_order)}")
         
         # Get unique segment values
-        cursor.execute("SELECT DISTINCT SEGMENT FROM instruments ORDER BY SEGMENT;")
-        segments = cursor.fetchall()
-        print(f"[INFO] Unique segments: {[seg[0] for seg in segments]}")
+        print(f"[INFO] Unique segments: {sorted(segment_totals, key=sql_order)}")
         
         # Get count by exchange
-        cursor.execute("SELECT EXCH_ID, COUNT(*) FROM instruments GROUP BY EXCH_ID ORDER BY COUNT(*) DESC;")
-        exchange_counts = cursor.fetchall()
         print(f"[INFO] Records by exchange:")
-        for ex, count in exchange_counts:
+        for ex, count in by_count(exchange_totals):
             print(f"  {ex}: {count}")
         
         # Get count by segment
-        cursor.execute("SELECT SEGMENT, COUNT(*) FROM instruments GROUP BY SEGMENT ORDER BY COUNT(*) DESC;")
-        segment_counts = cursor.fetchall()
         print(f"[INFO] Records by segment:")
-        for seg, count in segment_counts:
+        for seg, count in by_count(segment_totals):
             print(f"  {seg}: {count}")
         
         # Get NSE records by segment
-        cursor.execute("SELECT SEGMENT, COUNT(*) FROM instruments WHERE EXCH_ID = 'NSE' GROUP BY SEGMENT ORDER BY COUNT(*) DESC;")
-        nse_segments = cursor.fetchall()
         print(f"[INFO] NSE records by segment:")
-        for seg, count in nse_segments:
+        for seg, count in by_count(nse_segment_totals):
             print(f"  {seg}: {count}")
         
         # Get sample NSE equity records
@@ -47,7 +66,7 @@ def examine_sqlite():
         nse_samples = cursor.fetchall()
         print(f"[INFO] Sample NSE records:")
         for record in nse_samples:
-            print(f"  {record}")
+            print(f"  {tuple(record)}")
         
         conn.close()
         
@@ -8,14 +8,31 @@ from sqlalchemy import create_engine, text
 from database_config import get_postgres_url, get_database_engine_options
 
 def test_connection():
-    """Test database connection and fix common issues"""
+    """Test database connection and fix common issues.
+    
+    Returns the engine that connected so callers can keep using its pool,
+    or None if no connection could be made.
+    """
+    # Get connection details
+    db_url = get_postgres_url()
+    engine_options = get_database_engine_options()
+    
+    # Single pooled connection kept alive with TCP keepalives
+    engine_options = {
+        **engine_options,
+        'pool_pre_ping': True,
+        'pool_size': 1,
+        'connect_args': {
+            **engine_options.get('connect_args', {}),
+            'keepalives': 1,
+            'keepalives_idle': 30,
+            'keepalives_interval': 10
+        }
+    }
+    
     try:
         print("Testing PostgreSQL connection...")
         
-        # Get connection details
-        db_url = get_postgres_url()
-        engine_options = get_database_engine_options()
-        
         print(f"Database URL: {db_url.replace(os.getenv('DB_PASSWORD', 'Punit@1465'), '***')}")
         
         # Create engine with minimal options first
@@ -33,7 +50,7 @@ def test_connection():
             test_result = result.fetchone()[0]
             print(f"[OK] Query test successful: {test_result}")
             
-        return True
+        return engine
         
     except Exception as e:
         print(f"[ERROR] Connection failed: {e}")
@@ -42,7 +59,7 @@ def test_connection():
         # Try with different connection string
         try:
             alt_url = db_url.replace("postgresql://", "postgresql+psycopg2://")
-            alt_engine = create_engine(alt_url, pool_pre_ping=True)
+            alt_engine = create_engine(alt_url, **engine_options)
             
             with alt_engine.connect() as conn:
                 conn.execute(text("SELECT 1"))
@@ -50,12 +67,12 @@ def test_connection():
                 
                 # Update the database config
                 print("Updating database configuration...")
-                return True
+                return alt_engine
                 
         except Exception as e2:
             print(f"[ERROR] Alternative connection also failed: {e2}")
             
-        return False
+        return None
 
 def fix_type_issues():
     """Fix PostgreSQL type compatibility issues"""
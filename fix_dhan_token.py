@@ -4,21 +4,64 @@ Fix Dhan Token Integration
 This script ensures the Dhan token from dhan_token.json is properly integrated with the broker system.
 """
 
+import functools
 import json
+import mmap
 import os
+from pathlib import Path
 from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+load_dotenv()
+_DHAN_CLIENT_ID = os.getenv('DHAN_CLIENT_ID')
 
 def load_dhan_token():
     """Load token from dhan_token.json"""
     try:
-        if os.path.exists('dhan_token.json'):
-            with open('dhan_token.json', 'r') as f:
-                data = json.load(f)
-                return data.get('access_token'), data.get('expires_at')
+        mtime = os.stat('dhan_token.json').st_mtime_ns
+    except OSError:
+        return None, None
+    return _read_dhan_token(mtime)
+
+@functools.lru_cache(maxsize=1)
+def _read_dhan_token(mtime):
+    """Parse dhan_token.json; cached until the file's mtime changes"""
+    try:
+        data = json.loads(Path('dhan_token.json').read_bytes())
+        return data.get('access_token'), data.get('expires_at')
     except Exception as e:
         print(f"Error loading dhan_token.json: {e}")
     return None, None
 
+def _patch_env_token_in_place(env_path, token):
+    """Overwrite an existing DHAN_ACCESS_TOKEN value in place when the new
+    line is the same length as the old one. Returns True if patched."""
+    if not env_path.exists() or env_path.stat().st_size == 0:
+        return False
+    
+    key = b'DHAN_ACCESS_TOKEN='
+    new_line = key + token.encode()
+    with open(env_path, 'r+b') as f:
+        with mmap.mmap(f.fileno(), 0) as mm:
+            idx = mm.find(key)
+            # Only match the key at the start of a line
+            while idx > 0 and mm[idx - 1:idx] != b'\n':
+                idx = mm.find(key, idx + 1)
+            if idx == -1:
+                return False
+            
+            eol = mm.find(b'\n', idx)
+            if eol == -1:
+                eol = len(mm)
+            if eol > idx and mm[eol - 1:eol] == b'\r':
+                eol -= 1
+            if eol - idx != len(new_line):
+                return False
+            
+            mm[idx:eol] = new_line
+            mm.flush()
+    return True
+
 def update_env_file():
     """Update .env file with Dhan token"""
     token, expires_at = load_dhan_token()
@@ -31,26 +74,32 @@ def update_env_file():
         print("Token in dhan_token.json is expired")
         return False
     
-    # Read current .env file
-    env_lines = []
-    if os.path.exists('.env'):
-        with open('.env', 'r') as f:
-            env_lines = f.readlines()
+    env_path = Path('.env')
     
-    # Update or add DHAN_ACCESS_TOKEN
+    # Token refreshes usually keep the same length; patch those bytes in place
+    if _patch_env_token_in_place(env_path, token):
+        print(f"Updated .env with Dhan token (expires: {datetime.fromtimestamp(expires_at) if expires_at else 'unknown'})")
+        return True
+    
+    # Update or add DHAN_ACCESS_TOKEN in a single pass over .env
+    token_line = f'DHAN_ACCESS_TOKEN={token}\n'
+    lines = env_path.read_text().splitlines(keepends=True) if env_path.exists() else []
+    out = []
     token_found = False
-    for i, line in enumerate(env_lines):
-        if line.startswith('DHAN_ACCESS_TOKEN='):
-            env_lines[i] = f'DHAN_ACCESS_TOKEN={token}\n'
+    for line in lines:
+        if not token_found and line.startswith('DHAN_ACCESS_TOKEN='):
+            out.append(token_line)
             token_found = True
-            break
+        else:
+            out.append(line)
     
     if not token_found:
-        env_lines.append(f'DHAN_ACCESS_TOKEN={token}\n')
+        if out and not out[-1].endswith('\n'):
+            out.append('\n')
+        out.append(token_line)
     
     # Write back to .env
-    with open('.env', 'w') as f:
-        f.writelines(env_lines)
+    env_path.write_text(''.join(out))
     
     print(f"Updated .env with Dhan token (expires: {datetime.fromtimestamp(expires_at) if expires_at else 'unknown'})")
     return True
@@ -65,10 +114,8 @@ def create_broker_session():
             print("No token available")
             return False
         
-        # Get client ID from .env
-        from dotenv import load_dotenv
-        load_dotenv()
-        client_id = os.getenv('DHAN_CLIENT_ID')
+        # Client ID is read from .env once at import
+        client_id = _DHAN_CLIENT_ID
         
         if not client_id:
             print("DHAN_CLIENT_ID not found in .env")
@@ -5,17 +5,17 @@ Fix specific columns in mistakes table that are causing type mismatch errors.
 
 import os
 import sys
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 
 # Add the project directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from database_config import get_postgres_url
+from fix_mistakes_table import NUMERIC_PATTERN, get_engine
 
 def fix_specific_columns():
     """Fix the specific columns causing issues"""
     
-    engine = create_engine(get_postgres_url())
+    engine = get_engine()
     
     with engine.connect() as conn:
         trans = conn.begin()
@@ -38,12 +38,12 @@ def fix_specific_columns():
             
             # Fix risk_at_time column (should be NUMERIC)
             print("  Converting risk_at_time from VARCHAR to NUMERIC...")
-            conn.execute(text("""
+            conn.execute(text(f"""
                 ALTER TABLE mistakes 
                 ALTER COLUMN risk_at_time TYPE NUMERIC(18,2) 
                 USING CASE 
                     WHEN risk_at_time IS NULL OR risk_at_time = '' THEN NULL
-                    WHEN risk_at_time ~ '^-?[0-9]*[.]?[0-9]*$' THEN risk_at_time::NUMERIC
+                    WHEN risk_at_time ~ '{NUMERIC_PATTERN}' THEN risk_at_time::NUMERIC
                     ELSE NULL 
                 END;
             """))
@@ -59,7 +59,7 @@ def fix_specific_columns():
 
 def verify_columns():
     """Verify the column types are correct"""
-    engine = create_engine(get_postgres_url())
+    engine = get_engine()
     
     with engine.connect() as conn:
         result = conn.execute(text("""
@@ -6,6 +6,7 @@ This script addresses the OID 1043 (VARCHAR) vs numeric type mismatch error.
 
 import os
 import sys
+import functools
 from sqlalchemy import create_engine, text, inspect
 from sqlalchemy.exc import SQLAlchemyError
 
@@ -14,10 +15,18 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from database_config import get_postgres_url
 
+# Anchored and unambiguous: a bare "-" or "." no longer passes as numeric
+NUMERIC_PATTERN = r'^-?([0-9]+([.][0-9]*)?|[.][0-9]+)$'
+
+@functools.lru_cache(maxsize=1)
+def get_engine():
+    """Engine shared by the fix and verify steps so they reuse one pooled connection"""
+    return create_engine(get_postgres_url(), pool_pre_ping=True, pool_size=2, pool_recycle=1800)
+
 def fix_mistakes_table():
     """Fix the mistakes table schema to ensure proper data types"""
     
-    engine = create_engine(get_postgres_url())
+    engine = get_engine()
     
     with engine.connect() as conn:
         # Start transaction
@@ -35,6 +44,7 @@ def fix_mistakes_table():
             """))
             
             columns = result.fetchall()
+            col_types = {col[0]: col[1] for col in columns}
             print(f"Found {len(columns)} columns in mistakes table:")
             for col in columns:
                 print(f"  - {col[0]}: {col[1]} ({'NULL' if col[2] == 'YES' else 'NOT NULL'})")
@@ -44,33 +54,40 @@ def fix_mistakes_table():
             
             numeric_fields = ['pnl_impact', 'risk_at_time', 'confidence', 'recurrence_count', 'time_to_resolve_seconds']
             
+            present_fields = []
             for field in numeric_fields:
+                if field in col_types:
+                    present_fields.append(field)
+                else:
+                    print(f"  WARNING: Column {field} does not exist, skipping...")
+            
+            # Find up to 5 non-numeric values per field in a single round-trip
+            if present_fields:
+                validation_sql = "\nUNION ALL\n".join(f"""
+                    (SELECT '{field}' AS field, id, {field}::text AS val
+                     FROM mistakes
+                     WHERE {field} IS NOT NULL
+                     AND {field}::text !~ '{NUMERIC_PATTERN}'
+                     LIMIT 5)
+                """ for field in present_fields)
+                
+                # Stream through a server-side cursor instead of buffering the whole result
+                validation_stmt = text(validation_sql).execution_options(stream_results=True, yield_per=1000)
+                
+                bad_rows_by_field = {field: [] for field in present_fields}
                 try:
-                    # Check if column exists
-                    col_exists = any(col[0] == field for col in columns)
-                    if not col_exists:
-                        print(f"  WARNING: Column {field} does not exist, skipping...")
-                        continue
-                    
-                    # Find non-numeric values
-                    result = conn.execute(text(f"""
-                        SELECT id, {field} 
-                        FROM mistakes 
-                        WHERE {field} IS NOT NULL 
-                        AND {field}::text !~ '^-?[0-9]*[.]?[0-9]*$'
-                        LIMIT 5;
-                    """))
+                    for row in conn.execute(validation_stmt):
+                        bad_rows_by_field[row[0]].append(row)
                     
-                    bad_rows = result.fetchall()
-                    if bad_rows:
-                        print(f"  ERROR: Found {len(bad_rows)} invalid values in {field}:")
-                        for row in bad_rows:
-                            print(f"    ID {row[0]}: '{row[1]}'")
-                    else:
-                        print(f"  OK: {field} - all values are valid")
-                        
+                    for field, bad_rows in bad_rows_by_field.items():
+                        if bad_rows:
+                            print(f"  ERROR: Found {len(bad_rows)} invalid values in {field}:")
+                            for row in bad_rows:
+                                print(f"    ID {row[1]}: '{row[2]}'")
+                        else:
+                            print(f"  OK: {field} - all values are valid")
                 except Exception as e:
-                    print(f"  WARNING: Error checking {field}: {e}")
+                    print(f"  WARNING: Error checking numeric fields: {e}")
             
             # Fix data types if needed
             print("\nFixing data types...")
@@ -78,22 +95,28 @@ def fix_mistakes_table():
             # Clean up invalid data first
             print("  Cleaning invalid data...")
             
-            # Set empty strings and invalid values to NULL for numeric fields
-            for field in numeric_fields:
+            # Set empty strings and invalid values to NULL for all numeric fields in one UPDATE
+            if present_fields:
+                invalid = {
+                    field: f"({field}::text = '' OR {field}::text !~ '{NUMERIC_PATTERN}')"
+                    for field in present_fields
+                }
+                set_clause = ",\n".join(
+                    f"{field} = CASE WHEN {field} IS NOT NULL AND {cond} THEN NULL ELSE {field} END"
+                    for field, cond in invalid.items()
+                )
+                where_clause = " OR ".join(
+                    f"({field} IS NOT NULL AND {cond})" for field, cond in invalid.items()
+                )
                 try:
-                    col_exists = any(col[0] == field for col in columns)
-                    if not col_exists:
-                        continue
-                        
                     conn.execute(text(f"""
-                        UPDATE mistakes 
-                        SET {field} = NULL 
-                        WHERE {field} IS NOT NULL 
-                        AND ({field}::text = '' OR {field}::text !~ '^-?[0-9]*[.]?[0-9]*$');
+                        UPDATE mistakes
+                        SET {set_clause}
+                        WHERE {where_clause};
                     """))
-                    print(f"    OK: Cleaned {field}")
+                    print(f"    OK: Cleaned {', '.join(present_fields)}")
                 except Exception as e:
-                    print(f"    WARNING: Error cleaning {field}: {e}")
+                    print(f"    WARNING: Error cleaning numeric fields: {e}")
             
             # Now fix the column types
             print("  Updating column types...")
@@ -108,45 +131,39 @@ def fix_mistakes_table():
                 'attachments_count': 'INTEGER'
             }
             
+            # Collect every conversion so the table is altered (and rewritten) once
+            alter_clauses = []
+            converted_fields = []
             for field, new_type in type_fixes.items():
-                try:
-                    col_exists = any(col[0] == field for col in columns)
-                    if not col_exists:
-                        print(f"    WARNING: Column {field} does not exist, skipping...")
-                        continue
-                    
-                    # Check current type
-                    current_type = next((col[1] for col in columns if col[0] == field), None)
+                if field not in col_types:
+                    print(f"    WARNING: Column {field} does not exist, skipping...")
+                    continue
+                
+                # Check current type
+                current_type = col_types.get(field)
+                
+                if current_type and 'varchar' in current_type.lower():
+                    print(f"    Converting {field} from {current_type} to {new_type}")
                     
-                    if current_type and 'varchar' in current_type.lower():
-                        print(f"    Converting {field} from {current_type} to {new_type}")
-                        
-                        # Use USING clause to handle conversion
-                        if 'INTEGER' in new_type:
-                            conn.execute(text(f"""
-                                ALTER TABLE mistakes 
-                                ALTER COLUMN {field} TYPE {new_type} 
-                                USING CASE 
-                                    WHEN {field} IS NULL OR {field}::text = '' THEN NULL
-                                    ELSE {field}::INTEGER 
-                                END;
-                            """))
-                        else:  # NUMERIC
-                            conn.execute(text(f"""
-                                ALTER TABLE mistakes 
-                                ALTER COLUMN {field} TYPE {new_type} 
-                                USING CASE 
-                                    WHEN {field} IS NULL OR {field}::text = '' THEN NULL
-                                    ELSE {field}::NUMERIC 
-                                END;
-                            """))
-                        
+                    # Use USING clause to handle conversion
+                    cast_type = 'INTEGER' if 'INTEGER' in new_type else 'NUMERIC'
+                    alter_clauses.append(f"""
+                        ALTER COLUMN {field} TYPE {new_type}
+                        USING CASE
+                            WHEN {field} IS NULL OR {field}::text = '' THEN NULL
+                            ELSE {field}::{cast_type}
+                        END""")
+                    converted_fields.append(field)
+                else:
+                    print(f"    OK: {field} already has correct type ({current_type})")
+            
+            if alter_clauses:
+                try:
+                    conn.execute(text(f"ALTER TABLE mistakes {','.join(alter_clauses)};"))
+                    for field in converted_fields:
                         print(f"    OK: Successfully converted {field}")
-                    else:
-                        print(f"    OK: {field} already has correct type ({current_type})")
-                        
                 except Exception as e:
-                    print(f"    ERROR: Error converting {field}: {e}")
+                    print(f"    ERROR: Error converting {', '.join(converted_fields)}: {e}")
             
             # Commit transaction
             trans.commit()
@@ -160,41 +177,43 @@ def fix_mistakes_table():
             
 def verify_fix():
     """Verify that the fix worked"""
-    engine = create_engine(get_postgres_url())
+    engine = get_engine()
     
     with engine.connect() as conn:
         try:
             print("\nVerifying fix...")
             
-            # Check final column types
+            # Column types, row count and a sample row in one round-trip
             result = conn.execute(text("""
-                SELECT column_name, data_type 
-                FROM information_schema.columns 
-                WHERE table_name = 'mistakes' 
-                AND column_name IN ('pnl_impact', 'risk_at_time', 'confidence', 'recurrence_count', 'time_to_resolve_seconds', 'attachments_count')
-                ORDER BY column_name;
+                WITH cols AS (
+                    SELECT json_agg(json_build_array(column_name, data_type) ORDER BY column_name) AS meta
+                    FROM information_schema.columns 
+                    WHERE table_name = 'mistakes' 
+                    AND column_name IN ('pnl_impact', 'risk_at_time', 'confidence', 'recurrence_count', 'time_to_resolve_seconds', 'attachments_count')
+                ),
+                cnt AS (
+                    SELECT COUNT(*) AS n FROM mistakes
+                ),
+                sample AS (
+                    SELECT id, title, pnl_impact, confidence 
+                    FROM mistakes 
+                    LIMIT 1
+                )
+                SELECT cols.meta, cnt.n, sample.id, sample.title, sample.pnl_impact, sample.confidence
+                FROM cols CROSS JOIN cnt LEFT JOIN sample ON TRUE;
             """))
             
-            columns = result.fetchall()
+            meta, count, *sample = result.fetchone()
             print("Final column types:")
-            for col in columns:
-                print(f"  - {col[0]}: {col[1]}")
+            for column_name, data_type in meta or []:
+                print(f"  - {column_name}: {data_type}")
             
             # Test a simple query that was failing before
-            result = conn.execute(text("SELECT COUNT(*) FROM mistakes;"))
-            count = result.scalar()
             print(f"\nSuccessfully queried mistakes table: {count} records")
             
             # Test the specific query that was failing
-            result = conn.execute(text("""
-                SELECT id, title, pnl_impact, confidence 
-                FROM mistakes 
-                LIMIT 1;
-            """))
-            
-            row = result.fetchone()
-            if row:
-                print(f"Sample record: ID={row[0]}, Title='{row[1]}', PnL Impact={row[2]}, Confidence={row[3]}")
+            if sample[0] is not None:
+                print(f"Sample record: ID={sample[0]}, Title='{sample[1]}', PnL Impact={sample[2]}, Confidence={sample[3]}")
             else:
                 print("No records found, but query executed successfully")
                 
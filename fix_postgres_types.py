@@ -4,37 +4,56 @@ Fix PostgreSQL type compatibility issues
 """
 import os
 import sys
+import functools
+
+# Adapters registered by a previous call in this process
+_REGISTERED = False
+# hstore (oids, array oids) per database URL, so the catalog lookup runs once
+_HSTORE_OIDS = {}
+
+@functools.lru_cache(maxsize=1)
+def get_engine():
+    """Pooled engine reused by every fix_postgres_types() call in this process.
+    init_db_safe keeps using the Flask-SQLAlchemy engine, which owns its own pool."""
+    from sqlalchemy import create_engine
+    from database_config import get_postgres_url
+    return create_engine(get_postgres_url(), pool_pre_ping=True, pool_size=5, max_overflow=0)
 
 def fix_postgres_types():
     """Apply PostgreSQL type fixes"""
+    global _REGISTERED
     try:
         # Import required modules
         import psycopg2
         import psycopg2.extensions
         import psycopg2.extras
-        from sqlalchemy import create_engine
-        from database_config import get_postgres_url
         
         print("Applying PostgreSQL type fixes...")
         
-        # Register JSON adapter
-        psycopg2.extensions.register_adapter(dict, psycopg2.extras.Json)
+        # Register JSON adapter (process-wide, so only once)
+        if not _REGISTERED:
+            psycopg2.extensions.register_adapter(dict, psycopg2.extras.Json)
+            # Global UUID typecaster; no per-connection registration needed
+            try:
+                psycopg2.extras.register_uuid()
+            except:
+                pass
+            _REGISTERED = True
         
         # Create a test connection to register types
-        engine = create_engine(get_postgres_url())
+        engine = get_engine()
+        url = str(engine.url)
         with engine.connect() as conn:
             # This will register all PostgreSQL types
             raw_conn = conn.connection.connection
             
-            # Register UUID type if available
-            try:
-                psycopg2.extras.register_uuid(conn_or_curs=raw_conn)
-            except:
-                pass
-                
-            # Register hstore if available
+            # Register hstore if available, reusing its oids for this database
             try:
-                psycopg2.extras.register_hstore(raw_conn)
+                if url not in _HSTORE_OIDS:
+                    _HSTORE_OIDS[url] = psycopg2.extras.HstoreAdapter.get_oids(raw_conn)
+                oid, array_oid = _HSTORE_OIDS[url]
+                if oid:
+                    psycopg2.extras.register_hstore(raw_conn, oid=oid, array_oid=array_oid)
             except:
                 pass
         
@@ -3,14 +3,56 @@
 Safe database initialization script with PostgreSQL compatibility fixes
 """
 
+import hashlib
+import importlib
 import os
 import sys
+import traceback
 
 # Add current directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-def init_database_safely():
-    """Initialize database with proper error handling and type fixes"""
+# (module, init function, pass db?, success message, warning prefix); modules are
+# imported only when their step runs. BrokerSession has no init: importing it
+# registers the model, and its table comes from db.create_all().
+# Steps run in order on purpose: each blueprint init calls db.create_all() on the
+# shared metadata (concurrent runs would race on CREATE TABLE), and the seed steps
+# share one session so their rows are committed together.
+BLUEPRINT_INITS = [
+    ('admin_blueprint', 'init_admin_db', True,
+     "Admin blueprint database initialized", "Admin blueprint initialization warning"),
+    ('employee_dashboard_bp', 'init_employee_dashboard_db', True,
+     "Employee dashboard blueprint database initialized", "Employee dashboard initialization warning"),
+    ('mentor', 'init_mentor_db', True,
+     "Mentor blueprint database initialized", "Mentor blueprint initialization warning"),
+    ('subscription_models', 'init_subscription_plans', False,
+     "Subscription plans initialized", "Subscription plans initialization warning"),
+    ('broker_session_model', None, False,
+     "Broker session table initialized", "Broker session initialization warning"),
+]
+
+# Inits that seed rows and accept commit=False, so all seed data lands in one commit
+DEFERRED_COMMIT_INITS = {'init_employee_dashboard_db', 'init_subscription_plans'}
+
+# Written after a clean run; holds the schema fingerprint it was written for
+SENTINEL_NAME = '.db_initialized'
+
+def _schema_fingerprint(db):
+    """Database name, server version and a hash of every mapped table and column
+    type, so any model change (or a different database) invalidates the sentinel"""
+    from sqlalchemy import text
+    database, server_version = db.session.execute(
+        text("SELECT current_database(), current_setting('server_version')")
+    ).one()
+    digest = hashlib.sha256()
+    for table in db.metadata.sorted_tables:
+        columns = ','.join(f"{col.name}:{col.type}" for col in table.columns)
+        digest.update(f"{table.name}({columns});".encode())
+    return f"{database}:{server_version}:{digest.hexdigest()}"
+
+def init_database_safely(force=False):
+    """Initialize database with proper error handling and type fixes.
+    Skips all work when the sentinel matches the current schema, unless force=True."""
     try:
         # Apply PostgreSQL fixes first
         from postgresql_fix import apply_postgresql_fixes, fix_sqlalchemy_postgresql
@@ -21,57 +63,62 @@ def init_database_safely():
         # Import app after fixes are applied
         from app import app, db
         
-        print("Creating database tables...")
+        sentinel_path = os.path.join(app.instance_path, SENTINEL_NAME)
         with app.app_context():
+            fingerprint = _schema_fingerprint(db)
+            if not force and os.path.exists(sentinel_path):
+                with open(sentinel_path, 'r') as f:
+                    if f.read().strip() == fingerprint:
+                        print("✅ Database already initialized for this schema, skipping")
+                        return True
+            
+            print("Creating database tables...")
             # Create all tables
             db.create_all()
             print("✅ Database tables created successfully")
             
             # Initialize blueprint databases
-            try:
-                from admin_blueprint import init_admin_db
-                init_admin_db(db)
-                print("✅ Admin blueprint database initialized")
-            except Exception as e:
-                print(f"⚠️  Admin blueprint initialization warning: {e}")
+            clean_run = True
+            for module_name, init_name, takes_db, done_msg, warn_msg in BLUEPRINT_INITS:
+                try:
+                    module = importlib.import_module(module_name)
+                    if init_name:
+                        init_fn = getattr(module, init_name)
+                        args = (db,) if takes_db else ()
+                        if init_name in DEFERRED_COMMIT_INITS:
+                            # SAVEPOINT per seed step: a failing step rolls back only
+                            # its own rows and leaves the shared transaction usable
+                            with db.session.begin_nested():
+                                init_fn(*args, commit=False)
+                        else:
+                            init_fn(*args)
+                    print(f"✅ {done_msg}")
+                except Exception as e:
+                    clean_run = False
+                    print(f"⚠️  {warn_msg}: {e}")
             
+            # Single commit for the seed rows added above
             try:
-                from employee_dashboard_bp import init_employee_dashboard_db
-                init_employee_dashboard_db(db)
-                print("✅ Employee dashboard blueprint database initialized")
+                db.session.commit()
             except Exception as e:
-                print(f"⚠️  Employee dashboard initialization warning: {e}")
+                clean_run = False
+                db.session.rollback()
+                print(f"⚠️  Seed data commit warning: {e}")
             
-            try:
-                from mentor import init_mentor_db
-                init_mentor_db(db)
-                print("✅ Mentor blueprint database initialized")
-            except Exception as e:
-                print(f"⚠️  Mentor blueprint initialization warning: {e}")
-            
-            try:
-                from subscription_models import init_subscription_plans
-                init_subscription_plans()
-                print("✅ Subscription plans initialized")
-            except Exception as e:
-                print(f"⚠️  Subscription plans initialization warning: {e}")
-            
-            try:
-                from broker_session_model import BrokerSession
-                # Table is created by db.create_all() above
-                print("✅ Broker session table initialized")
-            except Exception as e:
-                print(f"⚠️  Broker session initialization warning: {e}")
+            # Only a run without warnings may let the next one skip
+            if clean_run:
+                os.makedirs(app.instance_path, exist_ok=True)
+                with open(sentinel_path, 'w') as f:
+                    f.write(fingerprint)
         
         print("\n🎉 Database initialization completed successfully!")
         return True
         
     except Exception as e:
         print(f"❌ Database initialization failed: {e}")
-        import traceback
         traceback.print_exc()
         return False
 
 if __name__ == "__main__":
-    success = init_database_safely()
+    success = init_database_safely(force='--force' in sys.argv)
     sys.exit(0 if success else 1)
\ No newline at end of file
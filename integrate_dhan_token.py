@@ -4,21 +4,32 @@ Integrate Dhan Token with Broker System
 This script helps users integrate their existing Dhan token with the broker connection system.
 """
 
-import json
 import os
-from datetime import datetime, timedelta
+import shutil
+from datetime import datetime, timedelta, timezone
+
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
 
 def integrate_dhan_token():
     """Integrate existing Dhan token with broker system"""
     
+    # One clock read shared by the expiry check and the session record
+    now = datetime.now(timezone.utc)
+    now_ts = int(now.timestamp())
+    # broker_manager stores and compares session times as naive local time
+    local_now = now.astimezone().replace(tzinfo=None)
+    
     # Load token from dhan_token.json
     if not os.path.exists('dhan_token.json'):
         print("❌ dhan_token.json not found!")
         return False
     
     try:
-        with open('dhan_token.json', 'r') as f:
-            token_data = json.load(f)
+        with open('dhan_token.json', 'rb') as f:
+            token_data = _json.loads(f.read())
         
         access_token = token_data.get('access_token')
         expires_at = token_data.get('expires_at')
@@ -28,11 +39,11 @@ def integrate_dhan_token():
             return False
         
         # Check if token is expired
-        if expires_at and expires_at < int(datetime.now().timestamp()):
+        if expires_at and expires_at < now_ts:
             print("❌ Token in dhan_token.json is expired")
             return False
         
-        print(f"✅ Found valid Dhan token (expires: {datetime.fromtimestamp(expires_at) if expires_at else 'unknown'})")
+        print(f"✅ Found valid Dhan token (expires: {datetime.fromtimestamp(expires_at, timezone.utc) if expires_at else 'unknown'})")
         
     except Exception as e:
         print(f"❌ Error reading dhan_token.json: {e}")
@@ -56,29 +67,39 @@ def integrate_dhan_token():
     
     # Update .env with access token
     try:
-        env_lines = []
-        if os.path.exists('.env'):
-            with open('.env', 'r') as f:
-                env_lines = f.readlines()
-        
-        # Update or add DHAN_ACCESS_TOKEN
+        # Stream .env into a temp file, swapping DHAN_ACCESS_TOKEN on the way,
+        # then atomically replace the original
+        token_line = f'DHAN_ACCESS_TOKEN={access_token}\n'
         token_found = False
-        for i, line in enumerate(env_lines):
-            if line.startswith('DHAN_ACCESS_TOKEN='):
-                env_lines[i] = f'DHAN_ACCESS_TOKEN={access_token}\n'
-                token_found = True
-                break
-        
-        if not token_found:
-            env_lines.append(f'DHAN_ACCESS_TOKEN={access_token}\n')
+        last_line = '\n'
+        env_exists = os.path.exists('.env')
+        with open('.env.tmp', 'w') as out:
+            if env_exists:
+                with open('.env', 'r') as f:
+                    for line in f:
+                        if not token_found and line.startswith('DHAN_ACCESS_TOKEN='):
+                            line = token_line
+                            token_found = True
+                        out.write(line)
+                        last_line = line
+            
+            if not token_found:
+                if not last_line.endswith('\n'):
+                    out.write('\n')
+                out.write(token_line)
         
-        # Write back to .env
-        with open('.env', 'w') as f:
-            f.writelines(env_lines)
+        if env_exists:
+            shutil.copymode('.env', '.env.tmp')
+        os.replace('.env.tmp', '.env')
         
         print("✅ Updated .env with Dhan access token")
         
     except Exception as e:
+        # Don't leave a partial temp file behind
+        try:
+            os.remove('.env.tmp')
+        except OSError:
+            pass
         print(f"❌ Error updating .env: {e}")
         return False
     
@@ -101,10 +122,10 @@ def integrate_dhan_token():
             session_data = {
                 'access_token': access_token,
                 'client_id': client_id,
-                'session_id': f"dhan_{client_id}_{int(datetime.now().timestamp())}",
+                'session_id': f"dhan_{client_id}_{now_ts}",
                 'status': 'active',
-                'created_at': datetime.now().isoformat(),
-                'expires_at': datetime.fromtimestamp(expires_at).isoformat() if expires_at else (datetime.now() + timedelta(hours=24)).isoformat()
+                'created_at': local_now.isoformat(),
+                'expires_at': datetime.fromtimestamp(expires_at).isoformat() if expires_at else (local_now + timedelta(hours=24)).isoformat()
             }
             
             session_id = broker_manager.create_session('dhan', client_id, session_data)
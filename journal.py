@@ -1,15 +1,24 @@
 from flask import Flask, render_template, request, redirect, url_for, jsonify, flash, session, Blueprint, send_from_directory
 from toast_utils import ToastManager, toast_success, toast_error, toast_warning, toast_info
+from journal_metrics import reduce_equity, reduce_streaks, float_array, outcome_array
 import random
 import os
+import re
+import threading
+from functools import wraps
 from datetime import datetime, timedelta
+from decimal import Decimal
+from dataclasses import dataclass, field
+from typing import Optional
 from flask_sqlalchemy import SQLAlchemy
 import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pyotp
 from dotenv import load_dotenv
 from flask_session import Session
-from flask_login import login_required
+from flask_login import login_required, current_user
 from werkzeug.utils import secure_filename
 
 # Safe import of current_app
@@ -29,48 +38,55 @@ def safe_log_error(message):
     except Exception:
         print(f"ERROR: {message}")
 
+@dataclass(slots=True)
+class DashboardData:
+    """Template context for the journal dashboard; defaults are the empty state"""
+    recent_trades: list = field(default_factory=list)
+    win_rate: float = 0
+    highest_pnl: float = 0
+    trades_this_month: int = 0
+    risk_reward: float = 0
+    total_trades: int = 0
+    winning_trades: int = 0
+    losing_trades: int = 0
+    total_pnl: float = 0
+    monthly_pnl: float = 0
+    equity_curve: list = field(default_factory=list)
+    monthly_heatmap: list = field(default_factory=list)
+    current_streak: int = 0
+    longest_win_streak: int = 0
+    longest_loss_streak: int = 0
+    ai_insights: list = field(default_factory=list)
+    ai_risk_suggestions: list = field(default_factory=list)
+    mistake_alerts: list = field(default_factory=list)
+    rule_compliance: float = 0
+    avg_win: float = 0
+    avg_loss: float = 0
+    profit_factor: float = 0
+    max_drawdown: float = 0
+    expectancy: float = 0
+    sharpe_ratio: float = 0
+    risk_of_ruin: float = 0
+    avg_holding_time: str = "0 hours"
+    best_trade_symbol: Optional[str] = None
+    worst_trade_symbol: Optional[str] = None
+    most_profitable_strategy: Optional[str] = None
+    challenge_progress: list = field(default_factory=list)
+    reports_snapshot: dict = field(default_factory=lambda: {'period': 'No data', 'trades': 0, 'pnl': 0})
+    xp_points: int = 0
+    level: int = 1
+    badges: list = field(default_factory=list)
+    strategies: list = field(default_factory=list)
+    mistakes: list = field(default_factory=list)
+    now: datetime = field(default_factory=datetime.now)
+
+    def as_context(self):
+        """Shallow dict for render_template(**...); unlike asdict() it does not deep-copy"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
 def _get_empty_dashboard_data():
     """Return empty dashboard data structure for error cases"""
-    return {
-        'recent_trades': [],
-        'win_rate': 0,
-        'highest_pnl': 0,
-        'trades_this_month': 0,
-        'risk_reward': 0,
-        'total_trades': 0,
-        'winning_trades': 0,
-        'losing_trades': 0,
-        'total_pnl': 0,
-        'monthly_pnl': 0,
-        'equity_curve': [],
-        'monthly_heatmap': [],
-        'current_streak': 0,
-        'longest_win_streak': 0,
-        'longest_loss_streak': 0,
-        'ai_insights': [],
-        'ai_risk_suggestions': [],
-        'mistake_alerts': [],
-        'rule_compliance': 0,
-        'avg_win': 0,
-        'avg_loss': 0,
-        'profit_factor': 0,
-        'max_drawdown': 0,
-        'expectancy': 0,
-        'sharpe_ratio': 0,
-        'risk_of_ruin': 0,
-        'avg_holding_time': "0 hours",
-        'best_trade_symbol': None,
-        'worst_trade_symbol': None,
-        'most_profitable_strategy': None,
-        'challenge_progress': [],
-        'reports_snapshot': {'period': 'No data', 'trades': 0, 'pnl': 0},
-        'xp_points': 0,
-        'level': 1,
-        'badges': [],
-        'strategies': [],
-        'mistakes': [],
-        'now': datetime.now()
-    }
+    return DashboardData().as_context()
 
 # Apply PostgreSQL compatibility fixes early
 try:
@@ -78,6 +94,42 @@ try:
 except ImportError:
     pass
 
+# Optional fast JSON encoder for the larger API payloads
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional Redis for caching computed dashboard metrics
+try:
+    import redis
+except ImportError:
+    redis = None
+
+def _orjson_default(obj):
+    """Types orjson does not encode natively, rendered the way Flask's provider does"""
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _json_default(obj):
+    """Stdlib fallback matching orjson's output: datetimes as ISO 8601 strings"""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return _orjson_default(obj)
+
+def json_response(payload, status=200):
+    """
+    jsonify() replacement that encodes with orjson when it is installed.
+    datetime values are written as ISO 8601 (the same text as .isoformat()),
+    so payloads can carry them raw instead of pre-formatting every row.
+    """
+    if orjson is None:
+        body = json.dumps(payload, default=_json_default)
+    else:
+        body = orjson.dumps(payload, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+    return current_app.response_class(body, status=status, mimetype='application/json')
+
 
 
 
@@ -131,17 +183,17 @@ except ImportError as e:
     multi_broker_bp = None
 
 # Helper function for subscription checks
+# subscription_models imports this module, so its lookup is resolved on first use
+_get_user_active_subscription = None
+
 def subscription_required_journal(f):
     """Decorator to check subscription for journal routes"""
-    from functools import wraps
-    
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        from subscription_models import get_user_active_subscription
-        from flask_login import current_user
-        from flask import redirect, url_for, session
-        from toast_utils import toast_warning
-        
+        global _get_user_active_subscription
+        if _get_user_active_subscription is None:
+            from subscription_models import get_user_active_subscription as _get_user_active_subscription
+
         # Check if user is logged in via session
         if "email" not in session:
             toast_warning("Please log in to access Journal features.")
@@ -152,7 +204,7 @@ def subscription_required_journal(f):
             toast_warning("Please log in to access Journal features.")
             return redirect(url_for("login"))
             
-        active_sub = get_user_active_subscription(current_user.id)
+        active_sub = _get_user_active_subscription(current_user.id)
         if not active_sub:
             toast_warning("Active subscription required to access Journal features.")
             return redirect(url_for("subscription"))
@@ -182,12 +234,26 @@ USER_SESSIONS = {
     "dhan": {},
     "angel": {}
 }
+# Serialises bulk reloads of USER_APPS / USER_SESSIONS
+_BROKER_STATE_LOCK = threading.Lock()
 
 # DhanHQ constants
 DHAN_AUTH_BASE = "https://auth.dhan.co"
 ANGEL_API_BASE = "https://apiconnect.angelbroking.in"
 
+# Shared session for direct broker HTTP calls so connections (and TLS) are reused.
+# Retry only re-sends idempotent methods; POSTs are retried on connect errors only.
+BROKER_HTTP = requests.Session()
+BROKER_HTTP.mount('https://', HTTPAdapter(
+    pool_connections=20,
+    pool_maxsize=50,
+    max_retries=Retry(total=3, backoff_factor=0.3),
+))
+
 # ---------------- MODELS ---------------- #
+# Creation timestamps are filled in by Postgres; naive UTC to match datetime.utcnow
+UTC_NOW = db.text("timezone('utc', now())")
+
 class Trade(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     symbol = db.Column(db.String(20), nullable=False)
@@ -204,14 +270,27 @@ class Trade(db.Model):
     strategy_id = db.Column(db.Integer, db.ForeignKey('strategies.id'), nullable=True)
 
     
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, server_default=UTC_NOW)
 
-    @property
-    def is_win(self):
-        return self.result == 'win'
+    # derived at write time by Postgres and read back with the row
+    pct_return = db.Column(db.Float, db.Computed(
+        "CASE WHEN entry_price > 0 THEN ((exit_price - entry_price) / entry_price) * 100 ELSE 0 END",
+        persisted=True))
+    is_win = db.Column(db.Boolean, db.Computed("result = 'win'", persisted=True))
+
+    # strategy aggregates filter on strategy_id and count by result; lists sort by date
+    __table_args__ = (
+        db.Index('ix_trade_strategy_result', 'strategy_id', 'result'),
+        db.Index('ix_trade_date', 'date'),
+        # dashboard win/loss aggregates and best/worst lookups filter on result
+        db.Index('ix_trade_result_date', 'result', 'date'),
+    )
 
     @property
     def percentage(self):
+        if self.pct_return is not None:
+            return self.pct_return
+        # not flushed yet, so the generated column has no value
         if self.entry_price > 0:
             return ((self.exit_price - self.entry_price) / self.entry_price) * 100
         return 0
@@ -230,8 +309,8 @@ class Rule(db.Model):
     linked_strategy_id = db.Column(db.Integer, db.ForeignKey('strategies.id'), nullable=True)
     violation_consequence = db.Column(db.String(20), default='log')  # log, warn, notify
     save_template = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, server_default=UTC_NOW)
+    updated_at = db.Column(db.DateTime, server_default=UTC_NOW, onupdate=datetime.utcnow)
     
     # Relationship
     linked_strategy = db.relationship('Strategy', backref='rules')
@@ -260,14 +339,16 @@ class RuleStats(db.Model):
     violations_count = db.Column(db.Integer, default=0)
     last_violation_date = db.Column(db.DateTime)
     last_violation_example = db.Column(db.Text)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, server_default=UTC_NOW, onupdate=datetime.utcnow)
     
     rule = db.relationship('Rule', backref='stats')
 
 
 # ---- Mistake + supporting models (replace the old simple Mistake class) ----
-from sqlalchemy import Index
-# Using generic db.JSON for PostgreSQL compatibility
+from sqlalchemy import event
+from sqlalchemy.orm import selectinload
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+# Metadata columns are native JSONB, so rows load as dicts with no json.loads
 
 # NOTE: using plain strings for "enums" for PostgreSQL compatibility.
 MISTAKE_CATEGORIES = ('execution', 'analysis', 'risk', 'psychology', 'process', 'other')
@@ -277,7 +358,7 @@ class MistakeTag(db.Model):
     __tablename__ = 'mistake_tags'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(80), nullable=False, unique=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, server_default=UTC_NOW)
 
 class Mistake(db.Model):
     __tablename__ = 'mistakes'
@@ -295,8 +376,8 @@ class Mistake(db.Model):
     confidence = db.Column(db.Integer, nullable=True)  # 0-100 subjective confidence in the classification
 
     # Lifecycle / audit
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = db.Column(db.DateTime, server_default=UTC_NOW, nullable=False)
+    updated_at = db.Column(db.DateTime, server_default=UTC_NOW, onupdate=datetime.utcnow, nullable=False)
     reviewed_at = db.Column(db.DateTime, nullable=True)
     resolved_at = db.Column(db.DateTime, nullable=True)
     resolved_by = db.Column(db.String(128), nullable=True)
@@ -307,12 +388,12 @@ class Mistake(db.Model):
 
     # Attachments & metadata
     # NOTE: attribute renamed to avoid SQLAlchemy reserved attribute 'metadata'
-    metadata_json = db.Column('metadata', db.Text, default='{}')
+    metadata_json = db.Column('metadata', JSONB, default=dict)
     attachments_count = db.Column(db.Integer, default=0)
 
 
-    # Tags (many-to-many)
-    tags = db.relationship('MistakeTag', secondary='mistake_tag_link', backref='mistakes', lazy='dynamic')
+    # Tags (many-to-many); selectin loads the tags of a whole result list in one IN query
+    tags = db.relationship('MistakeTag', secondary='mistake_tag_link', backref='mistakes', lazy='selectin')
 
     # KPIs & analytics fields
     pnl_impact = db.Column(db.Float, nullable=True)          # direct pnl impact (positive/negative)
@@ -322,13 +403,28 @@ class Mistake(db.Model):
 
     # free-text searchable combined column (optional helper)
     searchable_text = db.Column(db.Text, nullable=True)
+    # generated full-text vector over title + description, GIN-indexed below
+    search_tsv = db.Column(TSVECTOR, db.Computed(
+        "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))",
+        persisted=True))
 
     # relationships
     attachments = db.relationship('MistakeAttachment', backref='mistake', cascade='all, delete-orphan', lazy='dynamic')
     versions = db.relationship('MistakeVersion', backref='mistake', cascade='all, delete-orphan', lazy='dynamic')
     related_trade = db.relationship('Trade', backref=db.backref('mistakes', lazy='dynamic'), foreign_keys=[related_trade_id])
 
-    def to_dict(self, include_attachments=False):
+    __table_args__ = (
+        db.Index('ix_mistake_related_trade_id', 'related_trade_id'),
+        db.Index('ix_mistake_recurrence', 'recurrence_count'),
+        db.Index('ix_mistake_search_tsv', 'search_tsv', postgresql_using='gin'),
+        # partial indexes over live rows; list queries filter is_deleted = false
+        db.Index('ix_mistake_live_created', 'created_at', postgresql_where=db.text('is_deleted = false')),
+        db.Index('ix_mistake_live_category', 'category', postgresql_where=db.text('is_deleted = false')),
+    )
+
+    def to_dict(self, include_attachments=False, raw_datetimes=False):
+        """raw_datetimes leaves datetime objects for json_response to encode"""
+        dt = (lambda v: v) if raw_datetimes else (lambda v: v.isoformat() if v else None)
         d = {
             'id': self.id,
             'reporter_id': self.reporter_id,
@@ -338,14 +434,14 @@ class Mistake(db.Model):
             'category': self.category,
             'severity': self.severity,
             'confidence': self.confidence,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'reviewed_at': self.reviewed_at.isoformat() if self.reviewed_at else None,
-            'resolved_at': self.resolved_at.isoformat() if self.resolved_at else None,
+            'created_at': dt(self.created_at),
+            'updated_at': dt(self.updated_at),
+            'reviewed_at': dt(self.reviewed_at),
+            'resolved_at': dt(self.resolved_at),
             'resolved_by': self.resolved_by,
             'is_deleted': self.is_deleted,
             # expose metadata under the old key name for clients
-            'metadata': json.loads(self.metadata_json) if self.metadata_json and self.metadata_json != '{}' else {},
+            'metadata': self.metadata_json or {},
             'attachments_count': self.attachments_count,
             'pnl_impact': self.pnl_impact,
             'risk_at_time': self.risk_at_time,
@@ -354,7 +450,7 @@ class Mistake(db.Model):
             'tags': [t.name for t in self.tags],
         }
         if include_attachments:
-            d['attachments'] = [a.to_dict() for a in self.attachments.order_by(MistakeAttachment.created_at.desc()).all()]
+            d['attachments'] = [a.to_dict(raw_datetimes) for a in self.attachments.order_by(MistakeAttachment.created_at.desc()).all()]
         return d
 
 # Link table for many-to-many tags
@@ -375,10 +471,10 @@ class MistakeAttachment(db.Model):
     size = db.Column(db.Integer)
     url = db.Column(db.String(2000))   # path or CDN url
     # python attribute renamed to avoid SQLAlchemy reserved attribute 'metadata'
-    attachment_metadata_json = db.Column('metadata', db.Text, default='{}')
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    attachment_metadata_json = db.Column('metadata', JSONB, default=dict)
+    created_at = db.Column(db.DateTime, server_default=UTC_NOW)
 
-    def to_dict(self):
+    def to_dict(self, raw_datetimes=False):
         return {
             'id': self.id,
             'filename': self.filename,
@@ -386,8 +482,8 @@ class MistakeAttachment(db.Model):
             'size': self.size,
             'url': self.url,
             # expose as 'metadata' to clients to keep API stable
-            'metadata': json.loads(self.attachment_metadata_json) if self.attachment_metadata_json and self.attachment_metadata_json != '{}' else {},
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'metadata': self.attachment_metadata_json or {},
+            'created_at': self.created_at if raw_datetimes else (self.created_at.isoformat() if self.created_at else None)
         }
 
 
@@ -399,7 +495,7 @@ class MistakeVersion(db.Model):
     version_number = db.Column(db.Integer, nullable=False)
     snapshot = db.Column(db.JSON, nullable=False)  # snapshot of mistake.to_dict()
     created_by = db.Column(db.String(128), nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, server_default=UTC_NOW)
 
 # Link mistakes to multiple trades (optional to keep history)
 class MistakeTradeLink(db.Model):
@@ -408,13 +504,9 @@ class MistakeTradeLink(db.Model):
     mistake_id = db.Column(db.Integer, db.ForeignKey('mistakes.id', ondelete='CASCADE'), nullable=False, index=True)
     trade_id = db.Column(db.Integer, db.ForeignKey('trade.id', ondelete='CASCADE'), nullable=False, index=True)
     note = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, server_default=UTC_NOW)
 
-# Indexes for faster search (title + description)
-
-Index('ix_mistakes_searchable_text', Mistake.searchable_text)
-
-# PostgreSQL full-text search can be implemented using tsvector columns if needed
+# Full-text search over title + description uses Mistake.search_tsv (GIN index above)
 
 
 class Challenge(db.Model):
@@ -434,8 +526,8 @@ class Challenge(db.Model):
     milestones = db.Column(db.JSON, default=list)  # [{"value": 5000, "label": "First 5K"}]
     motivation_quote = db.Column(db.Text)
     status = db.Column(db.String(20), default='ongoing')  # ongoing/completed/failed/paused
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, server_default=UTC_NOW)
+    updated_at = db.Column(db.DateTime, server_default=UTC_NOW, onupdate=datetime.utcnow)
     
     # Relationships
     trades = db.relationship('ChallengeTrade', backref='challenge', cascade='all, delete-orphan', lazy='dynamic')
@@ -469,7 +561,7 @@ class ChallengeTrade(db.Model):
     trade_date = db.Column(db.Date, nullable=False, default=datetime.utcnow)
     pnl = db.Column(db.Float, nullable=False)
     notes = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, server_default=UTC_NOW)
     
     def to_dict(self):
         return {
@@ -488,7 +580,7 @@ class ChallengeMood(db.Model):
     date = db.Column(db.Date, nullable=False, default=datetime.utcnow)
     mood = db.Column(db.String(20), nullable=False)  # happy/neutral/sad/angry/confident
     note = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, server_default=UTC_NOW)
     
     def to_dict(self):
         return {
@@ -540,13 +632,16 @@ class Strategy(db.Model):
     backtests = db.Column(db.JSON, default=list)         # list of backtest summaries / results
 
     # bookkeeping
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, server_default=UTC_NOW)
+    updated_at = db.Column(db.DateTime, server_default=UTC_NOW, onupdate=datetime.utcnow)
 
     # relationship to trades
     trades = db.relationship('Trade', backref='strategy', lazy='dynamic')
 
-    def to_dict(self):
+    def to_dict(self, agg=None):
+        """Serialize the strategy. Pass the map from compute_strategy_aggregates()
+        to take the computed fields from it instead of querying per instance."""
+        stats = agg.get(self.id, _EMPTY_STRATEGY_AGG) if agg is not None else self._trade_stats()
         return {
             "id": self.id,
             "name": self.name,
@@ -572,32 +667,57 @@ class Strategy(db.Model):
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
             # computed fields below
-            "total_trades": self.total_trades,
-            "total_pnl": self.total_pnl,
-            "win_rate": self.win_rate
+            "total_trades": stats["total_trades"],
+            "total_pnl": stats["total_pnl"],
+            "win_rate": stats["win_rate"]
         }
 
+    def _trade_stats(self):
+        """Trade count, pnl and win rate for this strategy"""
+        return compute_strategy_aggregates([self.id]).get(self.id, _EMPTY_STRATEGY_AGG)
+
     @property
     def total_trades(self):
-        return self.trades.count()
+        return self._trade_stats()["total_trades"]
 
     @property
     def total_pnl(self):
         # sum of trade.pnl for linked trades
-        try:
-            total = db.session.query(db.func.coalesce(db.func.sum(Trade.pnl), 0.0)).filter(Trade.strategy_id == self.id).scalar()
-            return float(total or 0.0)
-        except Exception:
-            # fallback (less efficient)
-            return float(sum([t.pnl for t in self.trades.all()] or [0.0]))
+        return self._trade_stats()["total_pnl"]
 
     @property
     def win_rate(self):
-        total = self.trades.filter(Trade.result.in_(['win','loss'])).count()
-        if total == 0:
-            return 0.0
-        wins = self.trades.filter_by(result='win').count()
-        return round((wins / total) * 100, 2)
+        return self._trade_stats()["win_rate"]
+
+_EMPTY_STRATEGY_AGG = {"total_trades": 0, "total_pnl": 0.0, "win_rate": 0.0}
+
+def _strategy_agg_row(total_trades, total_pnl, wins, decided):
+    return {
+        "total_trades": total_trades or 0,
+        "total_pnl": float(total_pnl or 0.0),
+        "win_rate": round((wins / decided) * 100, 2) if decided else 0.0,
+    }
+
+def compute_strategy_aggregates(strategy_ids=None):
+    """
+    Trade count, total pnl and win rate for every strategy in one GROUP BY,
+    as {strategy_id: {"total_trades", "total_pnl", "win_rate"}}. Strategies
+    without trades are absent; treat them as _EMPTY_STRATEGY_AGG.
+    """
+    query = db.session.query(
+        Trade.strategy_id,
+        db.func.count(Trade.id),
+        db.func.coalesce(db.func.sum(Trade.pnl), 0.0),
+        db.func.sum(db.case((Trade.result == 'win', 1), else_=0)),
+        db.func.sum(db.case((Trade.result.in_(['win', 'loss']), 1), else_=0)),
+    ).filter(Trade.strategy_id.isnot(None))
+    if strategy_ids is not None:
+        query = query.filter(Trade.strategy_id.in_(strategy_ids))
+
+    agg = {}
+    for strategy_id, total_trades, total_pnl, wins, decided in query.group_by(Trade.strategy_id):
+        agg[strategy_id] = _strategy_agg_row(total_trades, total_pnl, wins, decided)
+    return agg
 
 # StrategyVersion model to support versioning endpoints used in your blueprint
 class StrategyVersion(db.Model):
@@ -606,9 +726,9 @@ class StrategyVersion(db.Model):
     strategy_id = db.Column(db.Integer, db.ForeignKey('strategies.id'), nullable=False)
     version_number = db.Column(db.Integer, nullable=False)
     name = db.Column(db.String(150))
-    config_data = db.Column(db.Text)   # JSON string of saved config
+    config_data = db.Column(JSONB)   # saved config
     created_by = db.Column(db.String(128), nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, server_default=UTC_NOW)
 
     strategy = db.relationship('Strategy', backref=db.backref('versions', lazy='dynamic'))
 
@@ -618,7 +738,7 @@ class BacktestSummary(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     strategy_id = db.Column(db.Integer, db.ForeignKey('strategies.id'), nullable=False)
     name = db.Column(db.String(200))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, server_default=UTC_NOW)
     summary = db.Column(db.JSON, default={})   # store the summary payload
 
     strategy = db.relationship('Strategy', backref=db.backref('backtest_models', lazy='dynamic'))
@@ -629,9 +749,9 @@ class Watchlist(db.Model):
     __tablename__ = 'watchlists'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False, default='My Watchlist')
-    symbols = db.Column(db.Text)  # JSON array of symbols
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    symbols = db.Column(JSONB)  # array of symbols
+    created_at = db.Column(db.DateTime, server_default=UTC_NOW)
+    updated_at = db.Column(db.DateTime, server_default=UTC_NOW)
 
 
 class AuditLog(db.Model):
@@ -640,12 +760,16 @@ class AuditLog(db.Model):
     action = db.Column(db.String(50), nullable=False)  # 'create', 'update', 'delete'
     table_name = db.Column(db.String(50), nullable=False)
     record_id = db.Column(db.Integer)
-    old_values = db.Column(db.Text)  # JSON string
-    new_values = db.Column(db.Text)  # JSON string
+    old_values = db.Column(JSONB)
+    new_values = db.Column(JSONB)
     user_id = db.Column(db.String(100))
     ip_address = db.Column(db.String(45))
     user_agent = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, server_default=UTC_NOW)
+
+    __table_args__ = (
+        db.Index('ix_audit_log_new_values', 'new_values', postgresql_using='gin'),
+    )
 
 # --- add to MODELS area (below Challenge) ---
 class BrokerAccount(db.Model):
@@ -682,55 +806,103 @@ class BrokerAccount(db.Model):
 
 # Add these helper functions after the model definitions
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from flask import app
 from datetime import datetime
 
-def save_broker_account(broker, user_id, **kwargs):
+_BROKER_ACCOUNT_FIELDS = ('api_key', 'api_secret', 'client_id', 'access_token', 'totp_secret')
+
+def save_broker_accounts_bulk(rows):
     """
-    Create or update BrokerAccount row.
-    If 'access_token' present and truthy, mark account connected and set last_connected_at.
+    Create or update many BrokerAccount rows with a single
+    INSERT ... ON CONFLICT (broker, user_id) DO UPDATE and one commit.
+    Each row is a dict with 'broker', 'user_id' and any of the credential fields;
+    None leaves the stored value untouched, and any other key raises TypeError.
+    Rows for the same (broker, user_id) are merged in order, later non-None
+    values winning, since one statement may not update a row twice. A truthy
+    'access_token' marks the account connected and sets last_connected_at.
+    Returns the row ids in the order of ``rows``.
     """
-    acc = BrokerAccount.query.filter_by(broker=broker, user_id=user_id).first()
-    if not acc:
-        acc = BrokerAccount(broker=broker, user_id=user_id)
-        db.session.add(acc)
-
-    for k, v in kwargs.items():
-        if v is not None and hasattr(acc, k):
-            setattr(acc, k, v)
+    if not rows:
+        return []
+
+    merged = {}
+    for row in rows:
+        unknown = set(row) - {'broker', 'user_id', *_BROKER_ACCOUNT_FIELDS}
+        if unknown:
+            raise TypeError(f"Unknown BrokerAccount fields: {', '.join(sorted(unknown))}")
+        key = (row['broker'], row['user_id'])
+        value = merged.setdefault(key, dict.fromkeys(_BROKER_ACCOUNT_FIELDS))
+        value.update({k: v for k, v in row.items() if k in _BROKER_ACCOUNT_FIELDS and v is not None})
+
+    now = datetime.utcnow()
+    values = []
+    for (broker, user_id), fields in merged.items():
+        connected = bool(fields['access_token'])
+        values.append({
+            'broker': broker,
+            'user_id': user_id,
+            **fields,
+            'connected': connected,
+            'last_connected_at': now if connected else None,
+        })
 
-    # If an access token was provided, set connected / timestamp
-    if 'access_token' in kwargs and kwargs.get('access_token'):
-        acc.connected = True
-        acc.last_connected_at = datetime.utcnow()
+    table = BrokerAccount.__table__
+    stmt = pg_insert(table).values(values)
+    excluded = stmt.excluded
+    set_ = {name: db.func.coalesce(excluded[name], table.c[name]) for name in _BROKER_ACCOUNT_FIELDS}
+    set_['connected'] = db.case((excluded.connected, True), else_=table.c.connected)
+    set_['last_connected_at'] = db.func.coalesce(excluded.last_connected_at, table.c.last_connected_at)
+    stmt = stmt.on_conflict_do_update(index_elements=['broker', 'user_id'], set_=set_).returning(
+        table.c.broker, table.c.user_id, table.c.id)
 
+    ids = {(broker, user_id): account_id for broker, user_id, account_id in db.session.execute(stmt)}
     db.session.commit()
+    invalidate_dashboard_cache()
+    return [ids[(row['broker'], row['user_id'])] for row in rows]
+
+def save_broker_account(broker, user_id, **kwargs):
+    """
+    Create or update BrokerAccount row.
+    If 'access_token' present and truthy, mark account connected and set last_connected_at.
+    Raises TypeError for keyword arguments that are not credential fields.
+    """
+    account_id, = save_broker_accounts_bulk([dict(kwargs, broker=broker, user_id=user_id)])
+    connected = bool(kwargs.get('access_token'))
 
     # use current_app.logger instead of global app
     try:
-        current_app.logger.info("Saved broker account %s/%s (connected=%s)", broker, user_id, acc.connected)
+        current_app.logger.info("Saved broker account %s/%s (connected=%s)", broker, user_id, connected)
     except RuntimeError:
         # not in an application context (e.g., called during CLI/non-request); fallback to print
-        print(f"Saved broker account {broker}/{user_id} (connected={acc.connected})")
+        print(f"Saved broker account {broker}/{user_id} (connected={connected})")
 
-    return acc
+    return db.session.get(BrokerAccount, account_id)
 
 from flask import current_app
 
 def mark_connected(broker, user_id, connected=True):
-    acc = BrokerAccount.query.filter_by(broker=broker, user_id=user_id).first()
-    if not acc:
-        return None
-    acc.connected = bool(connected)
+    table = BrokerAccount.__table__
+    values = {'connected': bool(connected)}
     if connected:
-        acc.last_connected_at = datetime.utcnow()
+        values['last_connected_at'] = datetime.utcnow()
+    # Single UPDATE ... RETURNING instead of load-then-flush
+    account_id = db.session.execute(
+        table.update()
+        .where(table.c.broker == broker, table.c.user_id == user_id)
+        .values(**values)
+        .returning(table.c.id)
+    ).scalar()
+    if account_id is None:
+        return None
     db.session.commit()
+    invalidate_dashboard_cache()
     try:
         current_app.logger.info("Marked connected=%s for %s/%s", connected, broker, user_id)
     except RuntimeError:
         print(f"Marked connected={connected} for {broker}/{user_id}")
-    return acc
+    return db.session.get(BrokerAccount, account_id)
 
 def load_persisted_accounts_into_memory(app=None):
     """
@@ -741,17 +913,27 @@ def load_persisted_accounts_into_memory(app=None):
         from flask import current_app
         app = current_app
     with app.app_context():
-        accounts = BrokerAccount.query.all()
-        from flask import current_app
-        try:
-            current_app.logger.info("Loading %d persisted broker accounts into memory", len(accounts))
-        except RuntimeError:
-            # not running inside an app context — ignore/log differently
-            pass
+        # Only the columns needed, streamed, so no BrokerAccount objects are built
+        rows = db.session.execute(
+            db.select(
+                BrokerAccount.id, BrokerAccount.broker, BrokerAccount.user_id,
+                BrokerAccount.api_key, BrokerAccount.api_secret, BrokerAccount.client_id,
+                BrokerAccount.access_token, BrokerAccount.totp_secret,
+                BrokerAccount.connected, BrokerAccount.last_connected_at,
+            ).execution_options(yield_per=500)
+        )
 
-        for acc in accounts:
+        # Built locally and merged in under the lock below, so readers never see a half-filled dict
+        apps = {}
+        sessions = {}
+        expired_ids = []
+        count = 0
+        # Sessions older than 24 hours are expired
+        cutoff = datetime.utcnow() - timedelta(hours=24)
+        for acc in rows:
+            count += 1
             # Always restore credentials to USER_APPS
-            USER_APPS.setdefault(acc.broker, {})[acc.user_id] = {
+            apps.setdefault(acc.broker, {})[acc.user_id] = {
                 "api_key": acc.api_key,
                 "api_secret": acc.api_secret,
                 "client_id": acc.client_id,
@@ -761,21 +943,33 @@ def load_persisted_accounts_into_memory(app=None):
             # restore in-memory session if token exists and not expired
             if acc.access_token and acc.connected:
                 # Check if connection is not expired (24 hours)
-                if acc.last_connected_at and (datetime.utcnow() - acc.last_connected_at) < timedelta(hours=24):
+                if acc.last_connected_at and acc.last_connected_at > cutoff:
                     if acc.broker == "kite":
-                        USER_SESSIONS.setdefault("kite", {})[acc.user_id] = {"access_token": acc.access_token}
+                        sessions.setdefault("kite", {})[acc.user_id] = {"access_token": acc.access_token}
                     elif acc.broker == "dhan":
-                        USER_SESSIONS.setdefault("dhan", {})[acc.user_id] = {"access_token": acc.access_token, "dhan_client_id": acc.client_id, "mode": "direct"}
+                        sessions.setdefault("dhan", {})[acc.user_id] = {"access_token": acc.access_token, "dhan_client_id": acc.client_id, "mode": "direct"}
                     elif acc.broker == "angel":
                         # We can't reconstruct SmartConnect object after restart, but store tokens so front-end knows it's connected
-                        USER_SESSIONS.setdefault("angel", {})[acc.user_id] = {"jwt_token": acc.access_token, "client_code": acc.client_id}
+                        sessions.setdefault("angel", {})[acc.user_id] = {"jwt_token": acc.access_token, "client_code": acc.client_id}
                     app.logger.info("Restored session for %s/%s", acc.broker, acc.user_id)
                 else:
-                    # Mark as disconnected if expired
-                    acc.connected = False
-                    acc.access_token = None
-                    db.session.commit()
+                    expired_ids.append(acc.id)
                     app.logger.info("Expired session for %s/%s", acc.broker, acc.user_id)
+        app.logger.info("Loaded %d persisted broker accounts into memory", count)
+
+        with _BROKER_STATE_LOCK:
+            for store, loaded in ((USER_APPS, apps), (USER_SESSIONS, sessions)):
+                for broker, entries in loaded.items():
+                    store.setdefault(broker, {}).update(entries)
+
+        # Mark expired sessions as disconnected in one statement
+        if expired_ids:
+            db.session.execute(
+                db.update(BrokerAccount)
+                .where(BrokerAccount.id.in_(expired_ids))
+                .values(connected=False, access_token=None)
+            )
+            db.session.commit()
 
 # ---------------- BROKER HELPER FUNCTIONS ---------------- #
 def get_kite_for_user(user_id, access_token=None):
@@ -809,7 +1003,7 @@ def _dhan_headers(partner_id, partner_secret):
 
 def _dhan_generate_consent(partner_id, partner_secret):
     url = f"{DHAN_AUTH_BASE}/partner/generate-consent"
-    r = requests.post(url, headers=_dhan_headers(partner_id, partner_secret), json={})
+    r = BROKER_HTTP.post(url, headers=_dhan_headers(partner_id, partner_secret), json={})
     r.raise_for_status()
     data = r.json() if r.headers.get("content-type","").startswith("application/json") else {}
     consent_id = data.get("consentId") or data.get("consent_id")
@@ -819,7 +1013,7 @@ def _dhan_generate_consent(partner_id, partner_secret):
 
 def _dhan_consume_consent(partner_id, partner_secret, token_id):
     url = f"{DHAN_AUTH_BASE}/partner/consume-consent"
-    r = requests.get(url, headers=_dhan_headers(partner_id, partner_secret), params={"tokenId": token_id})
+    r = BROKER_HTTP.get(url, headers=_dhan_headers(partner_id, partner_secret), params={"tokenId": token_id})
     r.raise_for_status()
     return r.json()
 
@@ -863,17 +1057,16 @@ def _angel_sdk_login(api_key: str, client_code: str, password: str, totp: str):
 
 
 # ---------------- FILE SERVING ---------------- #
+MISTAKE_UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), 'uploads', 'mistakes')
+try:
+    os.makedirs(MISTAKE_UPLOAD_FOLDER, exist_ok=True)
+except OSError as e:
+    print(f"Could not create mistake upload folder {MISTAKE_UPLOAD_FOLDER}: {e}")
+
 @calculatentrade_bp.route('/uploads/mistakes/<filename>')
 def serve_mistake_attachment(filename):
-    upload_folder = os.path.join(os.path.dirname(__file__), 'uploads', 'mistakes')
-    # Ensure the upload folder exists
-    os.makedirs(upload_folder, exist_ok=True)
-    
-    file_path = os.path.join(upload_folder, filename)
-    if not os.path.exists(file_path):
-        return jsonify({'error': 'File not found', 'path': file_path}), 404
-    
-    return send_from_directory(upload_folder, filename)
+    # send_from_directory raises NotFound for missing files
+    return send_from_directory(MISTAKE_UPLOAD_FOLDER, filename)
 
 # Debug route to check attachments
 @calculatentrade_bp.route('/debug/attachments/<int:mistake_id>')
@@ -881,7 +1074,7 @@ def debug_attachments(mistake_id):
     mistake = Mistake.query.get_or_404(mistake_id)
     attachments = mistake.attachments.all()
     
-    upload_folder = os.path.join(os.path.dirname(__file__), 'uploads', 'mistakes')
+    upload_folder = MISTAKE_UPLOAD_FOLDER
     
     debug_info = {
         'mistake_id': mistake_id,
@@ -932,46 +1125,49 @@ def api_validate_rule():
     
     return jsonify({'valid': True})
 
+# Constant payload, serialised once at import
+_RULE_TEMPLATES = [
+    {
+        'title': 'Always Use Stop Loss',
+        'description': 'Never enter a trade without setting a stop loss order',
+        'category': 'Risk',
+        'priority': 'high',
+        'tags': 'stop-loss,risk-management'
+    },
+    {
+        'title': 'Max 3 Trades Per Day',
+        'description': 'Limit daily trades to maximum 3 to avoid overtrading',
+        'category': 'Psychology',
+        'priority': 'medium',
+        'tags': 'overtrading,discipline'
+    },
+    {
+        'title': 'Risk Max 2% Per Trade',
+        'description': 'Never risk more than 2% of total capital on a single trade',
+        'category': 'Money Management',
+        'priority': 'high',
+        'tags': 'position-sizing,risk'
+    },
+    {
+        'title': 'Wait for Confirmation',
+        'description': 'Always wait for price confirmation before entering trades',
+        'category': 'Entry',
+        'priority': 'medium',
+        'tags': 'confirmation,patience'
+    },
+    {
+        'title': 'No Revenge Trading',
+        'description': 'Take a break after 2 consecutive losses to avoid emotional trading',
+        'category': 'Psychology',
+        'priority': 'high',
+        'tags': 'emotions,discipline'
+    }
+]
+_RULE_TEMPLATES_JSON = json.dumps({'templates': _RULE_TEMPLATES}, sort_keys=True)
+
 @calculatentrade_bp.route('/api/rules/templates')
 def api_rule_templates():
-    templates = [
-        {
-            'title': 'Always Use Stop Loss',
-            'description': 'Never enter a trade without setting a stop loss order',
-            'category': 'Risk',
-            'priority': 'high',
-            'tags': 'stop-loss,risk-management'
-        },
-        {
-            'title': 'Max 3 Trades Per Day',
-            'description': 'Limit daily trades to maximum 3 to avoid overtrading',
-            'category': 'Psychology',
-            'priority': 'medium',
-            'tags': 'overtrading,discipline'
-        },
-        {
-            'title': 'Risk Max 2% Per Trade',
-            'description': 'Never risk more than 2% of total capital on a single trade',
-            'category': 'Money Management',
-            'priority': 'high',
-            'tags': 'position-sizing,risk'
-        },
-        {
-            'title': 'Wait for Confirmation',
-            'description': 'Always wait for price confirmation before entering trades',
-            'category': 'Entry',
-            'priority': 'medium',
-            'tags': 'confirmation,patience'
-        },
-        {
-            'title': 'No Revenge Trading',
-            'description': 'Take a break after 2 consecutive losses to avoid emotional trading',
-            'category': 'Psychology',
-            'priority': 'high',
-            'tags': 'emotions,discipline'
-        }
-    ]
-    return jsonify({'templates': templates})
+    return current_app.response_class(_RULE_TEMPLATES_JSON, mimetype='application/json')
 
 @calculatentrade_bp.route('/api/rules/<int:rule_id>/toggle', methods=['POST'])
 def api_toggle_rule(rule_id):
@@ -1000,22 +1196,36 @@ def api_dashboard_equity_curve():
     
     return jsonify({'success': True, 'data': equity_data})
 
+def _monthly_pnl_buckets(months, now):
+    """
+    (month_start, pnl, trade_count) for the last `months` calendar months up to
+    the one containing `now`, newest first, from a single GROUP BY
+    date_trunc('month') query.
+    """
+    if months <= 0:
+        return []
+    month_starts = [now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)]
+    for _ in range(months - 1):
+        month_starts.append((month_starts[-1] - timedelta(days=1)).replace(day=1))
+
+    month = db.func.date_trunc('month', Trade.date)
+    rows = db.session.query(
+        month, db.func.coalesce(db.func.sum(Trade.pnl), 0.0), db.func.count(Trade.id)
+    ).filter(Trade.date >= month_starts[-1]).group_by(month).all()
+    totals = {bucket: (float(month_pnl), count) for bucket, month_pnl, count in rows}
+    return [(start,) + totals.get(start, (0.0, 0)) for start in month_starts]
+
 @calculatentrade_bp.route('/api/dashboard/monthly_heatmap')
 def api_dashboard_monthly_heatmap():
     """Get monthly P&L heatmap data for dashboard"""
     months = int(request.args.get('months', 12))
     heatmap_data = []
     
-    for i in range(months):
-        month_start = (datetime.now().replace(day=1) - timedelta(days=30*i)).replace(day=1)
-        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-        month_trades = Trade.query.filter(Trade.date >= month_start.date(), Trade.date <= month_end.date()).all()
-        month_pnl = sum(t.pnl for t in month_trades)
-        
+    for month_start, month_pnl, month_trades in _monthly_pnl_buckets(months, datetime.now()):
         heatmap_data.append({
             'month': month_start.strftime('%b %Y'),
             'pnl': round(month_pnl, 2),
-            'trades': len(month_trades),
+            'trades': month_trades,
             'color': 'green' if month_pnl > 0 else ('red' if month_pnl < 0 else 'gray')
         })
     
@@ -1127,6 +1337,443 @@ def api_dashboard_add_reflection():
         db.session.rollback()
         return jsonify({'success': False, 'message': str(e)}), 500
 
+@calculatentrade_bp.route('/api/dashboard/bulk_review', methods=['POST'])
+def api_dashboard_bulk_review():
+    """Mark many trades as reviewed with a single UPDATE"""
+    try:
+        data = request.get_json()
+        trade_ids = data.get('trade_ids') if data else None
+        if not isinstance(trade_ids, list) or not trade_ids:
+            return jsonify({'success': False, 'message': 'trade_ids list is required'}), 400
+        try:
+            trade_ids = [int(trade_id) for trade_id in trade_ids]
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'message': 'trade_ids must be integers'}), 400
+
+        current_time = datetime.now().strftime('%Y-%m-%d %H:%M')
+        review_note = f'\n[REVIEWED on {current_time}]'
+        result = db.session.execute(
+            db.update(Trade)
+            .where(Trade.id.in_(trade_ids))
+            .values(notes=db.func.coalesce(Trade.notes, '') + review_note)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        invalidate_dashboard_cache()
+
+        return jsonify({'success': True, 'message': f'{result.rowcount} trades marked as reviewed', 'updated': result.rowcount})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+
+# Dashboard metrics cache: Redis when REDIS_URL is configured, otherwise none.
+# Keyed by a generation counter plus the newest trade id. The generation is
+# bumped after a commit that flushed a model feeding the dashboard, and
+# explicitly by the Core INSERT/UPDATE helpers, which never flush.
+DASHBOARD_CACHE_TTL = 300
+_DASHBOARD_CACHE_GEN_KEY = 'dash:gen'
+
+_dashboard_redis = None
+if redis is not None and os.environ.get('REDIS_URL'):
+    try:
+        _dashboard_redis = redis.Redis.from_url(os.environ['REDIS_URL'], socket_timeout=0.5)
+    except Exception as e:
+        safe_log_error(f"Redis unavailable for dashboard cache: {e}")
+        _dashboard_redis = None
+
+def _dashboard_cache_key():
+    """Key for the current dashboard generation, or None when Redis is unavailable"""
+    if _dashboard_redis is None:
+        return None
+    try:
+        generation = int(_dashboard_redis.get(_DASHBOARD_CACHE_GEN_KEY) or 0)
+    except Exception as e:
+        safe_log_error(f"Dashboard cache key lookup failed: {e}")
+        return None
+    latest_trade_id = db.session.query(db.func.max(Trade.id)).scalar() or 0
+    return f"dash:{generation}:{latest_trade_id}"
+
+def _dashboard_cache_get(key):
+    """Cached metrics dict, or None on a miss or when Redis is unavailable"""
+    if key is None:
+        return None
+    try:
+        cached = _dashboard_redis.get(key)
+        if cached is None:
+            return None
+        return orjson.loads(cached) if orjson is not None else json.loads(cached)
+    except Exception as e:
+        safe_log_error(f"Dashboard cache read failed: {e}")
+        return None
+
+def _dashboard_cache_set(key, metrics):
+    if key is None:
+        return
+    try:
+        payload = orjson.dumps(metrics) if orjson is not None else json.dumps(metrics)
+        _dashboard_redis.setex(key, DASHBOARD_CACHE_TTL, payload)
+    except Exception as e:
+        safe_log_error(f"Dashboard cache write failed: {e}")
+
+def invalidate_dashboard_cache():
+    """Start a new cache generation; older entries simply expire"""
+    if _dashboard_redis is None:
+        return
+    try:
+        _dashboard_redis.incr(_DASHBOARD_CACHE_GEN_KEY)
+    except Exception as e:
+        safe_log_error(f"Dashboard cache invalidation failed: {e}")
+
+_DASHBOARD_MODELS = (Trade, Mistake, Strategy, Rule, Challenge, ChallengeTrade)
+
+def _note_dashboard_writes(session, flush_context, instances):
+    """Flag the transaction when a flush touches a model feeding the dashboard"""
+    if any(isinstance(obj, _DASHBOARD_MODELS) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info['dashboard_dirty'] = True
+
+def _invalidate_dashboard_after_commit(session):
+    # Only once the rows are committed, so no reader can recache stale metrics
+    if session.info.pop('dashboard_dirty', False):
+        invalidate_dashboard_cache()
+
+def _forget_dashboard_writes(session):
+    session.info.pop('dashboard_dirty', None)
+
+event.listen(db.session, 'before_flush', _note_dashboard_writes)
+event.listen(db.session, 'after_commit', _invalidate_dashboard_after_commit)
+event.listen(db.session, 'after_rollback', _forget_dashboard_writes)
+
+def _empty_dashboard_metrics():
+    """The empty dashboard in the shape _compute_dashboard_metrics returns"""
+    data = _get_empty_dashboard_data()
+    # passed to the template separately by dashboard()
+    for key in ('recent_trades', 'strategies', 'mistakes', 'now'):
+        del data[key]
+    return data
+
+def _compute_dashboard_metrics(recent_trades):
+    """All dashboard aggregates as a JSON-serializable dict (cacheable between requests)"""
+    now = datetime.now()
+
+    # Scalar trade metrics from one aggregate query instead of a scan per metric
+    try:
+        start_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        pnl = db.func.coalesce(Trade.pnl, 0.0)
+        is_win = Trade.result == 'win'
+        is_loss = Trade.result == 'loss'
+        this_month = Trade.date >= start_of_month.date()
+        (total_trades, winning_trades, losing_trades, total_pnl, highest_pnl,
+         gross_profit, gross_loss, trades_this_month, monthly_pnl, risk_reward) = db.session.query(
+            db.func.count(Trade.id),
+            db.func.count(Trade.id).filter(is_win),
+            db.func.count(Trade.id).filter(is_loss),
+            db.func.sum(pnl),
+            db.func.max(Trade.pnl).filter(is_win),
+            db.func.sum(pnl).filter(is_win),
+            db.func.sum(pnl).filter(is_loss),
+            db.func.count(Trade.id).filter(this_month),
+            db.func.sum(pnl).filter(this_month),
+            db.func.avg(Trade.reward / Trade.risk).filter(Trade.risk > 0, Trade.reward > 0),
+        ).one()
+
+        # ✅ FIX: Ensure all counts are integers for safe comparison
+        total_trades = int(total_trades or 0)
+        winning_trades = int(winning_trades or 0)
+        losing_trades = int(losing_trades or 0)
+        trades_this_month = int(trades_this_month or 0)
+        total_pnl = float(total_pnl or 0)
+        highest_pnl = float(highest_pnl or 0)
+        gross_profit = float(gross_profit or 0)
+        gross_loss = abs(float(gross_loss or 0))
+        monthly_pnl = float(monthly_pnl or 0)
+        risk_reward = round(float(risk_reward), 2) if risk_reward is not None else 0
+    except Exception as e:
+        safe_log_error(f"Error calculating trade metrics: {e}")
+        total_trades = winning_trades = losing_trades = trades_this_month = 0
+        total_pnl = highest_pnl = gross_profit = gross_loss = monthly_pnl = 0
+        risk_reward = 0
+
+    win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
+
+    # An empty journal has nothing else to derive; skip the remaining queries
+    if total_trades == 0:
+        return _empty_dashboard_metrics()
+
+    # Equity curve (last 30 days) and max drawdown (all trades) from one ordered,
+    # streamed pass over (date, pnl) rows instead of loading every Trade twice
+    try:
+        last_30_days = (now - timedelta(days=30)).date()
+        rows = db.session.execute(
+            db.select(Trade.date, Trade.pnl).order_by(Trade.date).execution_options(yield_per=1000)
+        )
+        pnls = []
+        equity_curve = []
+        cumulative_pnl = 0
+        for trade_date, trade_pnl in rows:
+            value = float(trade_pnl or 0)
+            pnls.append(value)
+            if trade_date.date() >= last_30_days:
+                cumulative_pnl += value
+                equity_curve.append({
+                    'date': trade_date.strftime('%Y-%m-%d'), 
+                    'pnl': round(cumulative_pnl, 2)
+                })
+        _, max_drawdown = reduce_equity(float_array(pnls))
+        max_drawdown = float(max_drawdown)
+    except Exception as e:
+        safe_log_error(f"Error calculating equity curve and max drawdown: {e}")
+        equity_curve = []
+        max_drawdown = 0
+    
+    # Monthly heatmap data (last 12 months)
+    try:
+        monthly_heatmap = [
+            {'month': month_start.strftime('%b %Y'), 'pnl': round(month_pnl, 2), 'trades': month_trades}
+            for month_start, month_pnl, month_trades in _monthly_pnl_buckets(12, now)
+        ]
+    except Exception as e:
+        safe_log_error(f"Error calculating monthly heatmap: {e}")
+        monthly_heatmap = []
+    
+    # Win/Loss streaks
+    try:
+        longest_win_streak, longest_loss_streak, current_streak = (
+            int(v) for v in reduce_streaks(outcome_array(recent_trades[::-1]))
+        )
+    except Exception as e:
+        safe_log_error(f"Error calculating streaks: {e}")
+        current_streak = 0
+        longest_win_streak = 0
+        longest_loss_streak = 0
+    
+    # AI insights (mock data for now)
+    try:
+        ai_insights = []
+        for t in recent_trades[:5]:
+            try:
+                ai_insights.append({
+                    "trade_id": t.id, 
+                    "reason": "Good entry timing", 
+                    "mistake": "Exit too early", 
+                    "improvement": "Hold for target"
+                })
+            except AttributeError:
+                continue
+        
+        ai_risk_suggestions = [
+            "Consider reducing position size by 10% based on recent volatility",
+            "Your win rate is strong - maintain current strategy",
+            "Review stop-loss levels - recent trades show 15% average loss"
+        ]
+    except Exception as e:
+        safe_log_error(f"Error generating AI insights: {e}")
+        ai_insights = []
+        ai_risk_suggestions = []
+    
+    # Mistake analysis
+    try:
+        # Filter and abs() in the database; only recurring mistakes come back
+        rows = Mistake.query.with_entities(
+            Mistake.title,
+            Mistake.recurrence_count,
+            Mistake.severity,
+            db.func.coalesce(db.func.abs(Mistake.pnl_impact), 0.0),
+        ).filter(Mistake.recurrence_count >= 3).all()
+        mistake_alerts = [
+            {'title': title, 'count': int(count), 'severity': severity, 'impact': float(impact)}
+            for title, count, severity, impact in rows
+        ]
+    except Exception as e:
+        safe_log_error(f"Error analyzing mistakes: {e}")
+        mistake_alerts = []
+    
+    # Rule compliance (mock calculation)
+    try:
+        total_rules = Rule.query.count() or 0
+        total_rules = int(total_rules)  # ✅ FIX: Ensure count is integer
+        rule_compliance = 85 if total_rules > 0 else 0  # Safe: int > int
+    except Exception as e:
+        safe_log_error(f"Error calculating rule compliance: {e}")
+        total_rules = 0
+        rule_compliance = 0
+    
+    # Advanced metrics (sums come from the aggregate query above)
+    avg_win = gross_profit / winning_trades if winning_trades > 0 else 0
+    avg_loss = gross_loss / losing_trades if losing_trades > 0 else 0
+
+    # Profit Factor = Gross Profit ÷ Gross Loss
+    profit_factor = gross_profit / gross_loss if gross_loss > 0 else 0
+    
+    # Expectancy = (Win% × AvgWin) - (Loss% × AvgLoss)
+    try:
+        # ✅ FIX: total_trades is already cast to int above, so comparison is safe
+        expectancy = (win_rate/100 * avg_win) - ((100-win_rate)/100 * avg_loss) if total_trades > 0 else 0
+    except Exception as e:
+        safe_log_error(f"Error calculating expectancy: {e}")
+        expectancy = 0
+    
+    # Sharpe ratio (simplified)
+    try:
+        # ✅ FIX: total_trades is already cast to int, comparisons are safe
+        if total_trades > 0 and total_pnl != 0:
+            avg_return = total_pnl / total_trades
+            # Simple volatility estimate
+            volatility = abs(total_pnl * 0.1) if total_pnl != 0 else 1
+            sharpe_ratio = avg_return / volatility
+        else:
+            sharpe_ratio = 0
+    except Exception as e:
+        safe_log_error(f"Error calculating Sharpe ratio: {e}")
+        sharpe_ratio = 0
+    
+    # Risk of ruin (simplified calculation)
+    try:
+        risk_of_ruin = max(0, min(100, (100 - win_rate) * 2)) if win_rate < 60 else 5
+    except Exception as e:
+        safe_log_error(f"Error calculating risk of ruin: {e}")
+        risk_of_ruin = 0
+    
+    # Average holding time (mock)
+    avg_holding_time = "2.5 hours"  # Would need entry/exit timestamps
+    
+    # Best and worst trade symbols
+    try:
+        # symbol only; the win/loss sums already come from the aggregate query
+        best_trade_symbol = db.session.query(Trade.symbol).filter(Trade.result == 'win') \
+            .order_by(Trade.pnl.desc()).limit(1).scalar()
+        worst_trade_symbol = db.session.query(Trade.symbol).filter(Trade.result == 'loss') \
+            .order_by(Trade.pnl.asc()).limit(1).scalar()
+    except Exception as e:
+        safe_log_error(f"Error finding best/worst trades: {e}")
+        best_trade_symbol = None
+        worst_trade_symbol = None
+    
+    # Most profitable strategy
+    try:
+        strategy_pnl = db.func.coalesce(db.func.sum(Trade.pnl), 0.0).label('strategy_pnl')
+        best = db.session.query(Strategy.name, strategy_pnl) \
+            .outerjoin(Trade, Trade.strategy_id == Strategy.id) \
+            .group_by(Strategy.id, Strategy.name) \
+            .order_by(strategy_pnl.desc(), Strategy.id) \
+            .first()
+        most_profitable_strategy = {'name': best.name, 'pnl': float(best.strategy_pnl)} if best else None
+    except Exception as e:
+        safe_log_error(f"Error finding most profitable strategy: {e}")
+        most_profitable_strategy = None
+    
+    # Challenge progress
+    try:
+        active_challenges = Challenge.query.filter_by(status='ongoing').all()
+        challenge_progress = []
+        for challenge in active_challenges[:3]:  # Top 3
+            try:
+                trades = challenge.trades.all()
+                current_pnl = sum(float(t.pnl or 0) for t in trades)
+                # ✅ FIX: Cast target_value to float to ensure numeric comparison
+                target_value = float(challenge.target_value) if challenge.target_value else 0
+                progress = (current_pnl / target_value * 100) if target_value > 0 else 0
+                challenge_progress.append({
+                    'title': challenge.title,
+                    'progress': min(progress, 100),
+                    'current': current_pnl,
+                    'target': target_value
+                })
+            except Exception:
+                continue
+    except Exception as e:
+        safe_log_error(f"Error calculating challenge progress: {e}")
+        challenge_progress = []
+    
+    # Reports snapshot
+    try:
+        last_7_days = now - timedelta(days=7)
+        week_trades = Trade.query.filter(Trade.date >= last_7_days.date()).all()
+        week_pnl = sum(float(t.pnl or 0) for t in week_trades)
+        
+        reports_snapshot = {
+            'period': 'Last 7 days',
+            'trades': len(week_trades),
+            'pnl': week_pnl
+        }
+    except Exception as e:
+        safe_log_error(f"Error calculating reports snapshot: {e}")
+        reports_snapshot = {'period': 'No data', 'trades': 0, 'pnl': 0}
+    
+    # Gamification (mock data)
+    try:
+        # ✅ FIX: Ensure xp_points calculation uses integers
+        xp_points = int(total_trades * 10 + winning_trades * 5)
+        level = min(10, xp_points // 100 + 1)
+        
+        badges = []
+        # ✅ FIX: winning_trades is already int, comparison is safe
+        if winning_trades >= 5:
+            badges.append({'name': '5 Wins', 'icon': 'trophy', 'color': 'gold'})
+        # ✅ FIX: win_rate is float, comparison is safe
+        if win_rate >= 60:
+            badges.append({'name': 'High Win Rate', 'icon': 'target', 'color': 'green'})
+        # ✅ FIX: monthly_pnl is float, comparison is safe
+        if monthly_pnl > 0:
+            badges.append({'name': 'Profitable Month', 'icon': 'chart-line', 'color': 'blue'})
+    except Exception as e:
+        safe_log_error(f"Error calculating gamification data: {e}")
+        xp_points = 0
+        level = 1
+        badges = []
+
+    return {
+        # Basic metrics
+        'win_rate': round(win_rate, 2),
+        'highest_pnl': highest_pnl,
+        'trades_this_month': trades_this_month,
+        'risk_reward': risk_reward,
+        'total_trades': total_trades,
+        'winning_trades': winning_trades,
+        'losing_trades': losing_trades,
+        'total_pnl': total_pnl,
+        'monthly_pnl': monthly_pnl,
+        
+        # Charts data
+        'equity_curve': equity_curve,
+        'monthly_heatmap': monthly_heatmap,
+        
+        # Streaks
+        'current_streak': current_streak,
+        'longest_win_streak': longest_win_streak,
+        'longest_loss_streak': longest_loss_streak,
+        
+        # AI insights
+        'ai_insights': ai_insights,
+        'ai_risk_suggestions': ai_risk_suggestions,
+        
+        # Mistakes & Rules
+        'mistake_alerts': mistake_alerts,
+        'rule_compliance': rule_compliance,
+        
+        # Advanced metrics
+        'avg_win': avg_win,
+        'avg_loss': avg_loss,
+        'profit_factor': profit_factor,
+        'max_drawdown': max_drawdown,
+        'expectancy': round(expectancy, 2),
+        'sharpe_ratio': round(sharpe_ratio, 2),
+        'risk_of_ruin': round(risk_of_ruin, 1),
+        'avg_holding_time': avg_holding_time,
+        'best_trade_symbol': best_trade_symbol,
+        'worst_trade_symbol': worst_trade_symbol,
+        'most_profitable_strategy': most_profitable_strategy,
+        
+        # Reports & Challenges
+        'challenge_progress': challenge_progress,
+        'reports_snapshot': reports_snapshot,
+        
+        # Gamification
+        'xp_points': xp_points,
+        'level': level,
+        'badges': badges,
+    }
+
 
 @calculatentrade_bp.route('/dashboard')
 @subscription_required_journal
@@ -1143,431 +1790,35 @@ def dashboard():
             )
         # Basic metrics with error handling
         try:
-            recent_trades = Trade.query.order_by(Trade.date.desc()).limit(10).all()
+            # Row projections: the table, streaks and insights only read these columns
+            recent_trades = db.session.execute(
+                db.select(
+                    Trade.id, Trade.symbol, Trade.date, Trade.trade_type, Trade.pnl, Trade.result,
+                    Strategy.name.label('strategy_name'),
+                ).outerjoin(Strategy, Trade.strategy_id == Strategy.id)
+                .order_by(Trade.date.desc()).limit(10)
+            ).all()
         except Exception as e:
             safe_log_error(f"Error fetching recent trades: {e}")
             recent_trades = []
         
-        try:
-            # ✅ FIX: Ensure all counts are integers for safe comparison
-            total_trades = Trade.query.count() or 0
-            winning_trades = Trade.query.filter_by(result='win').count() or 0
-            losing_trades = Trade.query.filter_by(result='loss').count() or 0
-            
-            # Ensure they are integers
-            total_trades = int(total_trades)
-            winning_trades = int(winning_trades)
-            losing_trades = int(losing_trades)
-        except Exception as e:
-            safe_log_error(f"Error fetching trade counts: {e}")
-            total_trades = 0
-            winning_trades = 0
-            losing_trades = 0
-        
-        win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
-    
-        # PnL calculations with error handling
-        try:
-            all_trades = Trade.query.all()
-            total_pnl = sum(float(t.pnl or 0) for t in all_trades)
-            highest_pnl_trade = Trade.query.filter_by(result='win').order_by(Trade.pnl.desc()).first()
-            highest_pnl = float(highest_pnl_trade.pnl) if highest_pnl_trade and highest_pnl_trade.pnl else 0
-        except Exception as e:
-            safe_log_error(f"Error calculating PnL: {e}")
-            total_pnl = 0
-            highest_pnl = 0
+        cache_key = _dashboard_cache_key()
+        metrics = _dashboard_cache_get(cache_key)
+        if metrics is None:
+            metrics = _compute_dashboard_metrics(recent_trades)
+            _dashboard_cache_set(cache_key, metrics)
     
-        # Monthly stats with error handling
-        try:
-            start_of_month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            # ✅ FIX: Ensure count is integer for safe comparison
-            trades_this_month = Trade.query.filter(Trade.date >= start_of_month.date()).count() or 0
-            trades_this_month = int(trades_this_month)
-            monthly_trades = Trade.query.filter(Trade.date >= start_of_month.date()).all()
-            monthly_pnl = sum(float(t.pnl or 0) for t in monthly_trades)
-        except Exception as e:
-            safe_log_error(f"Error calculating monthly stats: {e}")
-            trades_this_month = 0
-            monthly_pnl = 0
-    
-        # Risk/Reward calculations
-        try:
-            trades_with_risk = Trade.query.filter(
-                Trade.risk.isnot(None), 
-                Trade.reward.isnot(None),
-                Trade.risk > 0, 
-                Trade.reward > 0
-            ).all()
-        except Exception as e:
-            safe_log_error(f"Error fetching trades with risk: {e}")
-            trades_with_risk = []
-        
-        risk_reward = 0
-        if trades_with_risk:
-            # ✅ FIX: Ensure proper float conversion and safe comparison
-            valid_trades = []
-            for trade in trades_with_risk:
-                try:
-                    risk_val = float(trade.risk) if trade.risk is not None else 0.0
-                    reward_val = float(trade.reward) if trade.reward is not None else 0.0
-                    if risk_val > 0:
-                        valid_trades.append(reward_val / risk_val)
-                except (ValueError, TypeError, ZeroDivisionError):
-                    continue
-            if valid_trades:
-                risk_reward = round(sum(valid_trades) / len(valid_trades), 2)
-        
-        # Equity curve data (last 30 days)
-        try:
-            last_30_days = datetime.now() - timedelta(days=30)
-            trades_30_days = Trade.query.filter(Trade.date >= last_30_days.date()).order_by(Trade.date).all()
-            equity_curve = []
-            cumulative_pnl = 0
-            for trade in trades_30_days:
-                try:
-                    cumulative_pnl += float(trade.pnl or 0)
-                    equity_curve.append({
-                        'date': trade.date.strftime('%Y-%m-%d'), 
-                        'pnl': round(cumulative_pnl, 2)
-                    })
-                except (ValueError, TypeError, AttributeError):
-                    continue
-        except Exception as e:
-            safe_log_error(f"Error calculating equity curve: {e}")
-            equity_curve = []
-        
-        # Monthly heatmap data (last 12 months)
-        try:
-            monthly_heatmap = []
-            for i in range(12):
-                try:
-                    month_start = (datetime.now().replace(day=1) - timedelta(days=30*i)).replace(day=1)
-                    month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-                    month_trades = Trade.query.filter(
-                        Trade.date >= month_start.date(), 
-                        Trade.date <= month_end.date()
-                    ).all()
-                    month_pnl = sum(float(t.pnl or 0) for t in month_trades)
-                    monthly_heatmap.append({
-                        'month': month_start.strftime('%b %Y'),
-                        'pnl': round(month_pnl, 2),
-                        'trades': len(month_trades)
-                    })
-                except Exception:
-                    continue
-        except Exception as e:
-            safe_log_error(f"Error calculating monthly heatmap: {e}")
-            monthly_heatmap = []
-        
-        # Win/Loss streaks
-        try:
-            current_streak = 0
-            longest_win_streak = 0
-            longest_loss_streak = 0
-            temp_win_streak = 0
-            temp_loss_streak = 0
-            
-            for trade in reversed(recent_trades):
-                try:
-                    if trade.result == 'win':
-                        temp_win_streak += 1
-                        temp_loss_streak = 0
-                        longest_win_streak = max(longest_win_streak, temp_win_streak)
-                    elif trade.result == 'loss':
-                        temp_loss_streak += 1
-                        temp_win_streak = 0
-                        longest_loss_streak = max(longest_loss_streak, temp_loss_streak)
-                except AttributeError:
-                    continue
-            
-            current_streak = temp_win_streak if temp_win_streak > 0 else -temp_loss_streak
-        except Exception as e:
-            safe_log_error(f"Error calculating streaks: {e}")
-            current_streak = 0
-            longest_win_streak = 0
-            longest_loss_streak = 0
-        
-        # AI insights (mock data for now)
-        try:
-            ai_insights = []
-            for t in recent_trades[:5]:
-                try:
-                    ai_insights.append({
-                        "trade_id": t.id, 
-                        "reason": "Good entry timing", 
-                        "mistake": "Exit too early", 
-                        "improvement": "Hold for target"
-                    })
-                except AttributeError:
-                    continue
-            
-            ai_risk_suggestions = [
-                "Consider reducing position size by 10% based on recent volatility",
-                "Your win rate is strong - maintain current strategy",
-                "Review stop-loss levels - recent trades show 15% average loss"
-            ]
-        except Exception as e:
-            safe_log_error(f"Error generating AI insights: {e}")
-            ai_insights = []
-            ai_risk_suggestions = []
-        
-        # Mistake analysis
-        try:
-            mistake_alerts = []
-            mistakes = Mistake.query.all()
-            for mistake in mistakes:
-                try:
-                    # ✅ FIX: Ensure proper integer casting for count comparison
-                    count = int(mistake.recurrence_count or 1)
-                    if count >= 3:  # Safe: int >= int
-                        # ✅ FIX: Ensure pnl_impact is properly cast to float
-                        impact = abs(float(mistake.pnl_impact)) if mistake.pnl_impact is not None else 0.0
-                        mistake_alerts.append({
-                            'title': mistake.title,
-                            'count': count,
-                            'severity': mistake.severity,
-                            'impact': impact
-                        })
-                except (ValueError, TypeError, AttributeError):
-                    continue
-        except Exception as e:
-            safe_log_error(f"Error analyzing mistakes: {e}")
-            mistake_alerts = []
-        
-        # Rule compliance (mock calculation)
-        try:
-            total_rules = Rule.query.count() or 0
-            total_rules = int(total_rules)  # ✅ FIX: Ensure count is integer
-            rule_compliance = 85 if total_rules > 0 else 0  # Safe: int > int
-        except Exception as e:
-            safe_log_error(f"Error calculating rule compliance: {e}")
-            total_rules = 0
-            rule_compliance = 0
-        
-        # Advanced metrics
-        try:
-            # ✅ FIX: winning_trades and losing_trades are already cast to int above, so comparisons are safe
-            win_trades = Trade.query.filter_by(result='win').all()
-            loss_trades = Trade.query.filter_by(result='loss').all()
-            
-            avg_win = sum(float(t.pnl or 0) for t in win_trades) / winning_trades if winning_trades > 0 else 0
-            avg_loss = abs(sum(float(t.pnl or 0) for t in loss_trades) / losing_trades) if losing_trades > 0 else 0
-        except Exception as e:
-            safe_log_error(f"Error calculating advanced metrics: {e}")
-            avg_win = 0
-            avg_loss = 0
-        
-        # Profit Factor = Gross Profit ÷ Gross Loss
-        try:
-            win_trades = Trade.query.filter_by(result='win').all()
-            loss_trades = Trade.query.filter_by(result='loss').all()
-            
-            gross_profit = sum(float(t.pnl or 0) for t in win_trades)
-            gross_loss = abs(sum(float(t.pnl or 0) for t in loss_trades))
-            profit_factor = gross_profit / gross_loss if gross_loss > 0 else 0
-        except Exception as e:
-            safe_log_error(f"Error calculating profit factor: {e}")
-            profit_factor = 0
-        
-        # Max Drawdown calculation
-        try:
-            all_trades = Trade.query.order_by(Trade.date).all()
-            cumulative_pnl = 0
-            peak = 0
-            max_drawdown = 0
-            for trade in all_trades:
-                try:
-                    cumulative_pnl += float(trade.pnl or 0)
-                    if cumulative_pnl > peak:
-                        peak = cumulative_pnl
-                    drawdown = peak - cumulative_pnl
-                    if drawdown > max_drawdown:
-                        max_drawdown = drawdown
-                except (ValueError, TypeError):
-                    continue
-        except Exception as e:
-            safe_log_error(f"Error calculating max drawdown: {e}")
-            max_drawdown = 0
-        
-        # Expectancy = (Win% × AvgWin) - (Loss% × AvgLoss)
-        try:
-            # ✅ FIX: total_trades is already cast to int above, so comparison is safe
-            expectancy = (win_rate/100 * avg_win) - ((100-win_rate)/100 * avg_loss) if total_trades > 0 else 0
-        except Exception as e:
-            safe_log_error(f"Error calculating expectancy: {e}")
-            expectancy = 0
-        
-        # Sharpe ratio (simplified)
-        try:
-            # ✅ FIX: total_trades is already cast to int, comparisons are safe
-            if total_trades > 0 and total_pnl != 0:
-                avg_return = total_pnl / total_trades
-                # Simple volatility estimate
-                volatility = abs(total_pnl * 0.1) if total_pnl != 0 else 1
-                sharpe_ratio = avg_return / volatility
-            else:
-                sharpe_ratio = 0
-        except Exception as e:
-            safe_log_error(f"Error calculating Sharpe ratio: {e}")
-            sharpe_ratio = 0
-        
-        # Risk of ruin (simplified calculation)
-        try:
-            risk_of_ruin = max(0, min(100, (100 - win_rate) * 2)) if win_rate < 60 else 5
-        except Exception as e:
-            safe_log_error(f"Error calculating risk of ruin: {e}")
-            risk_of_ruin = 0
-        
-        # Average holding time (mock)
-        avg_holding_time = "2.5 hours"  # Would need entry/exit timestamps
-        
-        # Best and worst trade symbols
-        try:
-            best_trade = Trade.query.filter_by(result='win').order_by(Trade.pnl.desc()).first()
-            worst_trade = Trade.query.filter_by(result='loss').order_by(Trade.pnl.asc()).first()
-            best_trade_symbol = best_trade.symbol if best_trade else None
-            worst_trade_symbol = worst_trade.symbol if worst_trade else None
-        except Exception as e:
-            safe_log_error(f"Error finding best/worst trades: {e}")
-            best_trade_symbol = None
-            worst_trade_symbol = None
-        
-        # Most profitable strategy
-        try:
-            most_profitable_strategy = None
-            best_pnl = float('-inf')
-            strategies = Strategy.query.all()
-            for strategy in strategies:
-                try:
-                    strategy_trades = Trade.query.filter_by(strategy_id=strategy.id).all()
-                    strategy_pnl = sum(float(t.pnl or 0) for t in strategy_trades)
-                    if strategy_pnl > best_pnl:
-                        best_pnl = strategy_pnl
-                        most_profitable_strategy = {'name': strategy.name, 'pnl': strategy_pnl}
-                except Exception:
-                    continue
-        except Exception as e:
-            safe_log_error(f"Error finding most profitable strategy: {e}")
-            most_profitable_strategy = None
-        
-        # Challenge progress
-        try:
-            active_challenges = Challenge.query.filter_by(status='ongoing').all()
-            challenge_progress = []
-            for challenge in active_challenges[:3]:  # Top 3
-                try:
-                    trades = challenge.trades.all()
-                    current_pnl = sum(float(t.pnl or 0) for t in trades)
-                    # ✅ FIX: Cast target_value to float to ensure numeric comparison
-                    target_value = float(challenge.target_value) if challenge.target_value else 0
-                    progress = (current_pnl / target_value * 100) if target_value > 0 else 0
-                    challenge_progress.append({
-                        'title': challenge.title,
-                        'progress': min(progress, 100),
-                        'current': current_pnl,
-                        'target': target_value
-                    })
-                except Exception:
-                    continue
-        except Exception as e:
-            safe_log_error(f"Error calculating challenge progress: {e}")
-            challenge_progress = []
-        
-        # Reports snapshot
-        try:
-            last_7_days = datetime.now() - timedelta(days=7)
-            week_trades = Trade.query.filter(Trade.date >= last_7_days.date()).all()
-            week_pnl = sum(float(t.pnl or 0) for t in week_trades)
-            
-            reports_snapshot = {
-                'period': 'Last 7 days',
-                'trades': len(week_trades),
-                'pnl': week_pnl
-            }
-        except Exception as e:
-            safe_log_error(f"Error calculating reports snapshot: {e}")
-            reports_snapshot = {'period': 'No data', 'trades': 0, 'pnl': 0}
-        
-        # Gamification (mock data)
-        try:
-            # ✅ FIX: Ensure xp_points calculation uses integers
-            xp_points = int(total_trades * 10 + winning_trades * 5)
-            level = min(10, xp_points // 100 + 1)
-            
-            badges = []
-            # ✅ FIX: winning_trades is already int, comparison is safe
-            if winning_trades >= 5:
-                badges.append({'name': '5 Wins', 'icon': 'trophy', 'color': 'gold'})
-            # ✅ FIX: win_rate is float, comparison is safe
-            if win_rate >= 60:
-                badges.append({'name': 'High Win Rate', 'icon': 'target', 'color': 'green'})
-            # ✅ FIX: monthly_pnl is float, comparison is safe
-            if monthly_pnl > 0:
-                badges.append({'name': 'Profitable Month', 'icon': 'chart-line', 'color': 'blue'})
-        except Exception as e:
-            safe_log_error(f"Error calculating gamification data: {e}")
-            xp_points = 0
-            level = 1
-            badges = []
-    
-        return render_template(
-            'dashboard_new_journal.html',
-            # Basic metrics
+        # metrics stay a plain dict so they can be cached as JSON; the
+        # dataclass rejects any key the template context does not declare
+        data = DashboardData(
             recent_trades=recent_trades,
-            win_rate=round(win_rate, 2),
-            highest_pnl=highest_pnl,
-            trades_this_month=trades_this_month,
-            risk_reward=risk_reward,
-            total_trades=total_trades,
-            winning_trades=winning_trades,
-            losing_trades=losing_trades,
-            total_pnl=total_pnl,
-            monthly_pnl=monthly_pnl,
-            
-            # Charts data
-            equity_curve=equity_curve,
-            monthly_heatmap=monthly_heatmap,
-            
-            # Streaks
-            current_streak=current_streak,
-            longest_win_streak=longest_win_streak,
-            longest_loss_streak=longest_loss_streak,
-            
-            # AI insights
-            ai_insights=ai_insights,
-            ai_risk_suggestions=ai_risk_suggestions,
-            
-            # Mistakes & Rules
-            mistake_alerts=mistake_alerts,
-            rule_compliance=rule_compliance,
-            
-            # Advanced metrics
-            avg_win=avg_win,
-            avg_loss=avg_loss,
-            profit_factor=profit_factor,
-            max_drawdown=max_drawdown,
-            expectancy=round(expectancy, 2),
-            sharpe_ratio=round(sharpe_ratio, 2),
-            risk_of_ruin=round(risk_of_ruin, 1),
-            avg_holding_time=avg_holding_time,
-            best_trade_symbol=best_trade_symbol,
-            worst_trade_symbol=worst_trade_symbol,
-            most_profitable_strategy=most_profitable_strategy,
-            
-            # Reports & Challenges
-            challenge_progress=challenge_progress,
-            reports_snapshot=reports_snapshot,
-            
-            # Gamification
-            xp_points=xp_points,
-            level=level,
-            badges=badges,
+            **metrics,
             
             # Other data
             strategies=Strategy.query.all() if db else [],
             mistakes=Mistake.query.all() if db else [],
-            now=datetime.now()
         )
+        return render_template('dashboard_new_journal.html', **data.as_context())
     except Exception as e:
         safe_log_error(f"Critical error in journal dashboard: {e}")
         import traceback
@@ -1706,9 +1957,9 @@ def api_add_trade():
             
         # Validate required fields
         required_fields = ['symbol', 'entry_price', 'exit_price', 'quantity', 'date']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({'success': False, 'message': f'{field} is required'}), 400
+        for field_name in required_fields:
+            if not data.get(field_name):
+                return jsonify({'success': False, 'message': f'{field_name} is required'}), 400
         
         entry = float(data.get('entry_price', 0))
         exit_ = float(data.get('exit_price', 0))
@@ -1842,15 +2093,17 @@ def api_get_strategy(strategy_id):
 @subscription_required_journal
 def get_strategies():
     strategies = Strategy.query.all()
+    agg = compute_strategy_aggregates()
     enriched_strategies = []
     for s in strategies:
+        stats = agg.get(s.id, _EMPTY_STRATEGY_AGG)
         enriched_strategies.append({
             'id': s.id,
             'name': s.name,
             'description': s.description,
-            'win_rate': round(s.win_rate, 2),
-            'total_trades': s.total_trades,
-            'total_pnl': round(s.total_pnl, 2),
+            'win_rate': round(stats['win_rate'], 2),
+            'total_trades': stats['total_trades'],
+            'total_pnl': round(stats['total_pnl'], 2),
             'sharpe_ratio': s.sharpe_ratio,
             'max_drawdown': s.max_drawdown,
             'avg_trade_pl': s.avg_trade_pl,
@@ -1907,9 +2160,9 @@ def api_update_strategy(strategy_id):
             'primary_indicator', 'secondary_indicator'
         ]
 
-        for field in allowed_fields:
-            if field in data:
-                setattr(s, field, data[field])
+        for field_name in allowed_fields:
+            if field_name in data:
+                setattr(s, field_name, data[field_name])
 
         if 'parameters' in data:
             params = data.get('parameters') or []
@@ -2286,14 +2539,17 @@ def api_log_rule_violation(rule_id):
 @calculatentrade_bp.route('/mistakes')
 @subscription_required_journal
 def get_mistakes():
-    mistakes = Mistake.query.order_by(Mistake.created_at.desc()).all()
+    mistakes = (Mistake.query
+                .options(selectinload(Mistake.related_trade))
+                .order_by(Mistake.created_at.desc())
+                .all())
     enriched_mistakes = []
 
     for m in mistakes:
         # Get related trade info if exists
         related_trade_info = None
         if m.related_trade_id:
-            trade = Trade.query.get(m.related_trade_id)
+            trade = m.related_trade
             if trade:
                 related_trade_info = {
                     "id": trade.id,
@@ -2345,17 +2601,23 @@ def api_get_mistakes():
     if severity:
         qry = qry.filter_by(severity=severity)
     if q:
-        # simple search - for production replace with FTS
-        like = f"%{q}%"
-        qry = qry.filter(db.or_(Mistake.title.ilike(like), Mistake.description.ilike(like), Mistake.searchable_text.ilike(like)))
+        # prefix full-text match ("rev" finds "revenge") served by the GIN index
+        # on search_tsv; queries with no word characters fall back to ILIKE
+        words = re.findall(r'\w+', q)
+        if words:
+            tsquery = ' & '.join(f'{w}:*' for w in words)
+            qry = qry.filter(Mistake.search_tsv.op('@@')(db.func.to_tsquery('english', tsquery)))
+        else:
+            like = f'%{q}%'
+            qry = qry.filter(db.or_(Mistake.title.ilike(like), Mistake.description.ilike(like), Mistake.searchable_text.ilike(like)))
 
-    mistakes = [m.to_dict() for m in qry.order_by(Mistake.created_at.desc()).limit(200).all()]
-    return jsonify({'ok': True, 'mistakes': mistakes})
+    mistakes = [m.to_dict(raw_datetimes=True) for m in qry.order_by(Mistake.created_at.desc()).limit(200).all()]
+    return json_response({'ok': True, 'mistakes': mistakes})
 
 @calculatentrade_bp.route('/api/mistakes/<int:mistake_id>', methods=['GET'])
 def api_get_mistake(mistake_id):
     m = Mistake.query.get_or_404(mistake_id)
-    return jsonify(m.to_dict(include_attachments=True))
+    return json_response(m.to_dict(include_attachments=True, raw_datetimes=True))
 
 
 @calculatentrade_bp.route('/api/mistakes', methods=['POST'])
@@ -2413,8 +2675,7 @@ def api_add_mistake():
         except:
             metadata = {}
     
-    # Serialize metadata to JSON string
-    metadata_json = json.dumps(metadata) if metadata else '{}'
+    metadata_json = metadata or {}
 
     # Create Mistake with all available fields
     reporter_id = data.get('reporter_id')
@@ -2464,7 +2725,7 @@ def api_add_mistake():
             if file and file.filename:
                 filename = secure_filename(file.filename)
                 # Simple file storage (in production, use cloud storage)
-                upload_folder = os.path.join(os.path.dirname(__file__), 'uploads', 'mistakes')
+                upload_folder = MISTAKE_UPLOAD_FOLDER
                 os.makedirs(upload_folder, exist_ok=True)
                 file_path = os.path.join(upload_folder, f"{m.id}_{filename}")
                 file.save(file_path)
@@ -2479,7 +2740,7 @@ def api_add_mistake():
                     mime_type=file.content_type,
                     size=os.path.getsize(file_path),
                     url=url_for('calculatentrade.serve_mistake_attachment', filename=f"{m.id}_{filename}", _external=True),
-                    attachment_metadata_json='{}'
+                    attachment_metadata_json={}
                 )
                 db.session.add(attachment)
                 m.attachments_count = (m.attachments_count or 0) + 1
@@ -2551,7 +2812,7 @@ def api_update_mistake(mistake_id):
                 metadata = json.loads(metadata)
             except:
                 metadata = {}
-        m.metadata_json = json.dumps(metadata) if metadata else '{}'
+        m.metadata_json = metadata or {}
     
     # Handle tags update
     if 'tags' in data:
@@ -2588,7 +2849,7 @@ def api_update_mistake(mistake_id):
         for file in files:
             if file and file.filename:
                 filename = secure_filename(file.filename)
-                upload_folder = os.path.join(os.path.dirname(__file__), 'uploads', 'mistakes')
+                upload_folder = MISTAKE_UPLOAD_FOLDER
                 os.makedirs(upload_folder, exist_ok=True)
                 file_path = os.path.join(upload_folder, f"{m.id}_{filename}")
                 file.save(file_path)
@@ -2602,7 +2863,7 @@ def api_update_mistake(mistake_id):
                     mime_type=file.content_type,
                     size=os.path.getsize(file_path),
                     url=url_for('calculatentrade.serve_mistake_attachment', filename=f"{m.id}_{filename}", _external=True),
-                    attachment_metadata_json='{}'
+                    attachment_metadata_json={}
                 )
                 db.session.add(attachment)
                 m.attachments_count = m.attachments.count()
@@ -3363,18 +3624,23 @@ def api_strategies():
     if request.method == 'GET':
         try:
             strategies = Strategy.query.order_by(Strategy.created_at.desc()).all()
-            return jsonify({
-                'success': True,
-                'strategies': [{
+            agg = compute_strategy_aggregates()
+            payload = []
+            for s in strategies:
+                stats = agg.get(s.id, _EMPTY_STRATEGY_AGG)
+                payload.append({
                     'id': s.id,
                     'name': s.name,
                     'description': s.description,
-                    'win_rate': s.win_rate,
-                    'total_trades': s.total_trades,
-                    'total_pnl': s.total_pnl,
+                    'win_rate': stats['win_rate'],
+                    'total_trades': stats['total_trades'],
+                    'total_pnl': stats['total_pnl'],
                     'status': s.status,
                     'created_at': s.created_at.isoformat() if s.created_at else None
-                } for s in strategies]
+                })
+            return jsonify({
+                'success': True,
+                'strategies': payload
             })
         except Exception as e:
             return jsonify({'success': False, 'message': str(e)}), 500
@@ -3845,12 +4111,6 @@ def get_equity_insight(context):
 
 
 from flask import request, session, jsonify
-# optional: if you use flask-login
-try:
-    from flask_login import current_user
-except Exception:
-    current_user = None
-
 
 # Audit logging helper
 def log_audit(action, table_name, record_id=None, old_values=None, new_values=None):
@@ -3860,8 +4120,8 @@ def log_audit(action, table_name, record_id=None, old_values=None, new_values=No
             action=action,
             table_name=table_name,
             record_id=record_id,
-            old_values=json.dumps(old_values) if old_values else None,
-            new_values=json.dumps(new_values) if new_values else None,
+            old_values=old_values or None,
+            new_values=new_values or None,
             user_id=getattr(current_user, 'id', None) if current_user else None,
             ip_address=request.remote_addr if request else None,
             user_agent=request.headers.get('User-Agent') if request else None
@@ -4045,6 +4305,8 @@ def multi_broker_connect():
 
 
 # ---------- Helper for TOTP secret normalization ----------
+_NON_BASE32_RE = re.compile(r'[^A-Z2-7]')
+
 def _normalize_base32_secret(s: str):
     """
     Normalize a user-supplied TOTP secret into valid Base32.
@@ -4073,8 +4335,7 @@ def _normalize_base32_secret(s: str):
     s = "".join(s.split()).upper()
 
     # Remove non-base32 chars
-    import re
-    s = re.sub(r'[^A-Z2-7]', '', s)
+    s = _NON_BASE32_RE.sub('', s)
 
     # Pad to multiple of 8 chars
     if s:
@@ -5626,6 +5887,79 @@ def api_add_trade_from_broker():
         return jsonify({'ok': False, 'message': str(e)}), 500
 
 
+def bulk_insert_trades(rows):
+    """
+    Insert many trades with one executemany INSERT ... RETURNING id and a single
+    commit, bypassing per-object ORM flushes. rows are dicts of Trade column values.
+    Returns the new ids in input order.
+    """
+    if not rows:
+        return []
+    ids = db.session.execute(
+        db.insert(Trade).returning(Trade.id, sort_by_parameter_order=True), rows
+    ).scalars().all()
+    db.session.commit()
+    invalidate_dashboard_cache()
+    return ids
+
+@calculatentrade_bp.route('/api/trades/bulk_import', methods=['POST'])
+def api_bulk_import_trades():
+    """
+    Accepts JSON {'trades': [{symbol, entry_price, exit_price, quantity, date?,
+    trade_type?, strategy_id?, notes?}, ...]} (or the bare list) and inserts them in one batch.
+    pnl and result are derived the same way as /api/trades/from_broker.
+    """
+    data = request.get_json(force=True) or {}
+    trades = data.get('trades') if isinstance(data, dict) else data
+    if not isinstance(trades, list) or not trades:
+        return jsonify({'ok': False, 'message': 'trades list required'}), 400
+    now = datetime.utcnow()
+    rows = []
+    for i, t in enumerate(trades):
+        if not isinstance(t, dict):
+            return jsonify({'ok': False, 'message': f'trade {i}: expected an object'}), 400
+        symbol = t.get('symbol')
+        if not symbol or 'entry_price' not in t or 'exit_price' not in t:
+            return jsonify({'ok': False, 'message': f'trade {i}: symbol, entry_price and exit_price are required'}), 400
+        try:
+            entry_price = float(t.get('entry_price') or 0)
+            exit_price = float(t.get('exit_price') or 0)
+            qty = float(t.get('quantity') or 0)
+            risk = float(t.get('risk') or 0)
+            reward = float(t.get('reward') or 0)
+            strategy_id = int(t['strategy_id']) if t.get('strategy_id') else None
+        except (TypeError, ValueError):
+            return jsonify({'ok': False, 'message': f'trade {i}: prices, quantity, risk, reward and strategy_id must be numeric'}), 400
+        try:
+            trade_date = datetime.fromisoformat(t['date']) if t.get('date') else now
+        except (TypeError, ValueError):
+            return jsonify({'ok': False, 'message': f'trade {i}: date must be an ISO 8601 string'}), 400
+        trade_type = t.get('trade_type') or ('short' if entry_price > exit_price else 'long')
+        pnl = (exit_price - entry_price) * qty if trade_type == 'long' else (entry_price - exit_price) * qty
+        rows.append({
+            'symbol': symbol,
+            'entry_price': entry_price,
+            'exit_price': exit_price,
+            'quantity': qty,
+            'date': trade_date,
+            'result': 'win' if pnl > 0 else ('loss' if pnl < 0 else 'breakeven'),
+            'pnl': pnl,
+            'notes': t.get('notes'),
+            'trade_type': trade_type,
+            'risk': risk,
+            'reward': reward,
+            'strategy_id': strategy_id,
+            'created_at': now,
+        })
+    try:
+        ids = bulk_insert_trades(rows)
+        return jsonify({'ok': True, 'count': len(ids), 'ids': ids})
+    except Exception as e:
+        db.session.rollback()
+        safe_log_error(f"Failed /api/trades/bulk_import: {e}")
+        return jsonify({'ok': False, 'message': str(e)}), 500
+
+
 # ---------------- NEW ENHANCED API ENDPOINTS ---------------- #
 
 # Templates API
@@ -5656,10 +5990,10 @@ def api_revert_strategy(strategy_id, version_id):
         return jsonify({'ok': False, 'error': 'Version does not belong to strategy'}), 400
     
     # Restore strategy from version config
-    config = json.loads(version.config_data)
-    for field, value in config.items():
-        if hasattr(strategy, field):
-            setattr(strategy, field, value)
+    config = version.config_data or {}
+    for field_name, value in config.items():
+        if hasattr(strategy, field_name):
+            setattr(strategy, field_name, value)
     
     db.session.commit()
     log_audit('revert', 'strategy', strategy_id, None, {'reverted_to_version': version_id})
@@ -5730,6 +6064,7 @@ def api_run_backtest(strategy_id):
 @calculatentrade_bp.route('/api/strategies/<int:strategy_id>/details', methods=['GET'])
 def api_get_strategy_details(strategy_id):
     strategy = Strategy.query.get_or_404(strategy_id)
+    stats = strategy._trade_stats()
 
     # latest backtest stored in BacktestSummary model if exists
     latest = BacktestSummary.query.filter_by(strategy_id=strategy_id).order_by(BacktestSummary.created_at.desc()).first()
@@ -5745,8 +6080,8 @@ def api_get_strategy_details(strategy_id):
             'id': strategy.id,
             'name': strategy.name,
             'description': strategy.description,
-            'win_rate': round(strategy.win_rate or 0, 2),
-            'total_pnl': float(strategy.total_pnl or 0),
+            'win_rate': round(stats['win_rate'], 2),
+            'total_pnl': stats['total_pnl'],
             'sharpe_ratio': strategy.sharpe_ratio,
             'max_drawdown': strategy.max_drawdown,
             'stop_loss': strategy.stop_loss,
@@ -5766,11 +6101,11 @@ def api_get_strategy_details(strategy_id):
 def api_get_watchlist():
     watchlist = Watchlist.query.first()
     if not watchlist:
-        watchlist = Watchlist(name='Default Watchlist', symbols=json.dumps(['AAPL', 'MSFT', 'GOOGL']))
+        watchlist = Watchlist(name='Default Watchlist', symbols=['AAPL', 'MSFT', 'GOOGL'])
         db.session.add(watchlist)
         db.session.commit()
     
-    symbols = json.loads(watchlist.symbols) if watchlist.symbols else []
+    symbols = watchlist.symbols or []
     return jsonify({
         'ok': True,
         'data': {
@@ -5789,7 +6124,7 @@ def api_update_watchlist():
         db.session.add(watchlist)
     
     watchlist.name = data.get('name', watchlist.name)
-    watchlist.symbols = json.dumps(data.get('symbols', []))
+    watchlist.symbols = data.get('symbols', [])
     watchlist.updated_at = datetime.utcnow()
     db.session.commit()
     log_audit('update', 'watchlists', watchlist.id, None, data)
@@ -0,0 +1,86 @@
+"""
+Numeric reductions behind the trading journal dashboard.
+
+The kernels are compiled with numba when it is installed; otherwise the same
+functions run as plain Python loops over the numpy arrays.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is None:
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit"""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+# Outcome codes for reduce_streaks
+OUTCOME_WIN = 1
+OUTCOME_LOSS = -1
+OUTCOME_OTHER = 0
+
+
+@njit(cache=True)
+def reduce_equity(pnl):
+    """Cumulative equity and max drawdown (peak starts at zero) in one pass"""
+    n = pnl.shape[0]
+    equity = np.empty(n, dtype=np.float64)
+    cumulative = 0.0
+    peak = 0.0
+    max_drawdown = 0.0
+    for i in range(n):
+        cumulative += pnl[i]
+        equity[i] = cumulative
+        if cumulative > peak:
+            peak = cumulative
+        drawdown = peak - cumulative
+        if drawdown > max_drawdown:
+            max_drawdown = drawdown
+    return equity, max_drawdown
+
+
+@njit(cache=True)
+def reduce_streaks(outcomes):
+    """Longest win streak, longest loss streak and current streak (negative for losses)
+
+    ``outcomes`` is in chronological order; OUTCOME_OTHER entries neither
+    extend nor break a streak.
+    """
+    win_run = 0
+    loss_run = 0
+    longest_win = 0
+    longest_loss = 0
+    for i in range(outcomes.shape[0]):
+        if outcomes[i] == 1:
+            win_run += 1
+            loss_run = 0
+            if win_run > longest_win:
+                longest_win = win_run
+        elif outcomes[i] == -1:
+            loss_run += 1
+            win_run = 0
+            if loss_run > longest_loss:
+                longest_loss = loss_run
+    current = win_run if win_run > 0 else -loss_run
+    return longest_win, longest_loss, current
+
+
+def float_array(values):
+    """float64 array from a list of numbers"""
+    return np.fromiter(values, dtype=np.float64, count=len(values))
+
+
+def outcome_array(trades):
+    """int8 array of OUTCOME_* codes from each trade's result"""
+    codes = {'win': OUTCOME_WIN, 'loss': OUTCOME_LOSS}
+    return np.fromiter((codes.get(t.result, OUTCOME_OTHER) for t in trades), dtype=np.int8, count=len(trades))
+
+
+# Compile (or load from the numba cache) at import so the first dashboard
+# request does not pay for it.
+reduce_equity(np.zeros(1, dtype=np.float64))
+reduce_streaks(np.zeros(1, dtype=np.int8))
@@ -0,0 +1,26 @@
+"""Index emp_audit_log(timestamp, id) for keyset pagination
+
+Revision ID: add_audit_timestamp_id_index
+Revises: add_dashboard_trade_mistake_indexes
+Create Date: 2025-11-13 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_audit_timestamp_id_index'
+down_revision = 'add_dashboard_trade_mistake_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Audit log pages seek on (timestamp, id) < cursor; id breaks timestamp ties
+    op.execute("CREATE INDEX IF NOT EXISTS ix_audit_timestamp_id ON emp_audit_log (timestamp, id);")
+    op.execute("DROP INDEX IF EXISTS ix_audit_timestamp;")
+
+
+def downgrade():
+    op.execute("CREATE INDEX IF NOT EXISTS ix_audit_timestamp ON emp_audit_log (timestamp);")
+    op.execute("DROP INDEX IF EXISTS ix_audit_timestamp_id;")
@@ -0,0 +1,31 @@
+"""Index trade(result, date) and mistakes(recurrence_count) for the dashboard
+
+Revision ID: add_dashboard_trade_mistake_indexes
+Revises: add_mistake_live_partial_indexes
+Create Date: 2025-11-12 19:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_dashboard_trade_mistake_indexes'
+down_revision = 'add_mistake_live_partial_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Win/loss filters and best/worst trade lookups
+    op.execute("CREATE INDEX IF NOT EXISTS ix_trade_result_date ON trade (result, date);")
+    
+    # Recurring-mistake alerts filter on recurrence_count >= 3
+    op.execute("CREATE INDEX IF NOT EXISTS ix_mistake_recurrence ON mistakes (recurrence_count);")
+    
+    op.execute("ANALYZE trade;")
+    op.execute("ANALYZE mistakes;")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_mistake_recurrence;")
+    op.execute("DROP INDEX IF EXISTS ix_trade_result_date;")
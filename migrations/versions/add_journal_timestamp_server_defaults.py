@@ -0,0 +1,50 @@
+"""Server-side defaults for journal created_at/updated_at columns
+
+Revision ID: add_journal_timestamp_server_defaults
+Revises: convert_journal_json_columns_to_jsonb
+Create Date: 2025-11-12 17:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_journal_timestamp_server_defaults'
+down_revision = 'convert_journal_json_columns_to_jsonb'
+branch_labels = None
+depends_on = None
+
+TIMESTAMP_COLUMNS = (
+    ('trade', 'created_at'),
+    ('rule', 'created_at'),
+    ('rule', 'updated_at'),
+    ('rule_stats', 'updated_at'),
+    ('mistake_tags', 'created_at'),
+    ('mistakes', 'created_at'),
+    ('mistakes', 'updated_at'),
+    ('mistake_attachments', 'created_at'),
+    ('mistake_versions', 'created_at'),
+    ('mistake_trade_link', 'created_at'),
+    ('challenges', 'created_at'),
+    ('challenges', 'updated_at'),
+    ('challenge_trades', 'created_at'),
+    ('challenge_moods', 'created_at'),
+    ('strategies', 'created_at'),
+    ('strategies', 'updated_at'),
+    ('strategy_versions', 'created_at'),
+    ('backtest_summaries', 'created_at'),
+    ('watchlists', 'created_at'),
+    ('watchlists', 'updated_at'),
+    ('audit_logs', 'created_at'),
+)
+
+
+def upgrade():
+    # Naive UTC, matching the datetime.utcnow values already stored
+    for table, column in TIMESTAMP_COLUMNS:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET DEFAULT timezone('utc', now());")
+
+
+def downgrade():
+    for table, column in TIMESTAMP_COLUMNS:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} DROP DEFAULT;")
@@ -0,0 +1,33 @@
+"""Partial indexes on live (not soft-deleted) mistakes
+
+Revision ID: add_mistake_live_partial_indexes
+Revises: add_journal_timestamp_server_defaults
+Create Date: 2025-11-12 18:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_mistake_live_partial_indexes'
+down_revision = 'add_journal_timestamp_server_defaults'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Only live rows are indexed, so tombstones do not bloat list scans
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_mistake_live_created
+        ON mistakes (created_at) WHERE is_deleted = false;
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_mistake_live_category
+        ON mistakes (category) WHERE is_deleted = false;
+    """)
+    op.execute("ANALYZE mistakes;")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_mistake_live_category;")
+    op.execute("DROP INDEX IF EXISTS ix_mistake_live_created;")
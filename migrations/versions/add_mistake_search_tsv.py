@@ -0,0 +1,35 @@
+"""Generated tsvector column with GIN index for mistake search
+
+Revision ID: add_mistake_search_tsv
+Revises: add_trade_and_mistake_indexes
+Create Date: 2025-11-12 14:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_mistake_search_tsv'
+down_revision = 'add_trade_and_mistake_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        ALTER TABLE mistakes
+        ADD COLUMN IF NOT EXISTS search_tsv tsvector
+        GENERATED ALWAYS AS (
+            to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))
+        ) STORED;
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_mistake_search_tsv ON mistakes USING gin (search_tsv);")
+    
+    # The btree on searchable_text could not serve ILIKE '%...%' searches
+    op.execute("DROP INDEX IF EXISTS ix_mistakes_searchable_text;")
+
+
+def downgrade():
+    op.execute("CREATE INDEX IF NOT EXISTS ix_mistakes_searchable_text ON mistakes (searchable_text);")
+    op.execute("DROP INDEX IF EXISTS ix_mistake_search_tsv;")
+    op.execute("ALTER TABLE mistakes DROP COLUMN IF EXISTS search_tsv;")
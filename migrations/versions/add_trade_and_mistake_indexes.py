@@ -0,0 +1,34 @@
+"""Index trade(strategy_id, result), trade(date) and mistakes(related_trade_id)
+
+Revision ID: add_trade_and_mistake_indexes
+Revises: convert_mistake_metadata_to_jsonb
+Create Date: 2025-11-12 13:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_trade_and_mistake_indexes'
+down_revision = 'convert_mistake_metadata_to_jsonb'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Strategy aggregates group trades by strategy and count by result
+    op.execute("CREATE INDEX IF NOT EXISTS ix_trade_strategy_result ON trade (strategy_id, result);")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_trade_date ON trade (date);")
+    
+    # Mistakes are looked up by their linked trade
+    op.execute("CREATE INDEX IF NOT EXISTS ix_mistake_related_trade_id ON mistakes (related_trade_id);")
+    
+    # Refresh planner statistics so the new indexes are picked up right away
+    op.execute("ANALYZE trade;")
+    op.execute("ANALYZE mistakes;")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_mistake_related_trade_id;")
+    op.execute("DROP INDEX IF EXISTS ix_trade_date;")
+    op.execute("DROP INDEX IF EXISTS ix_trade_strategy_result;")
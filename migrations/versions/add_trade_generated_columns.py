@@ -0,0 +1,35 @@
+"""Generated pct_return and is_win columns on trade
+
+Revision ID: add_trade_generated_columns
+Revises: add_mistake_search_tsv
+Create Date: 2025-11-12 15:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_trade_generated_columns'
+down_revision = 'add_mistake_search_tsv'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        ALTER TABLE trade
+        ADD COLUMN IF NOT EXISTS pct_return double precision
+        GENERATED ALWAYS AS (
+            CASE WHEN entry_price > 0 THEN ((exit_price - entry_price) / entry_price) * 100 ELSE 0 END
+        ) STORED;
+    """)
+    op.execute("""
+        ALTER TABLE trade
+        ADD COLUMN IF NOT EXISTS is_win boolean
+        GENERATED ALWAYS AS (result = 'win') STORED;
+    """)
+
+
+def downgrade():
+    op.execute("ALTER TABLE trade DROP COLUMN IF EXISTS is_win;")
+    op.execute("ALTER TABLE trade DROP COLUMN IF EXISTS pct_return;")
@@ -0,0 +1,28 @@
+"""Add users.registered_on index for employee user listing
+
+Revision ID: add_user_registered_on_index
+Revises: add_email_verification_system
+Create Date: 2025-11-10 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_registered_on_index'
+down_revision = 'add_email_verification_system'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Employee dashboard lists users newest first
+    op.execute("CREATE INDEX IF NOT EXISTS ix_users_registered_on ON users (registered_on DESC);")
+    
+    # Audit log pages are ordered and keyset-paginated by timestamp
+    op.execute("CREATE INDEX IF NOT EXISTS ix_audit_timestamp ON emp_audit_log (timestamp);")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_audit_timestamp;")
+    op.execute("DROP INDEX IF EXISTS ix_users_registered_on;")
@@ -0,0 +1,42 @@
+"""Store strategy version config, watchlist symbols and audit log values as JSONB
+
+Revision ID: convert_journal_json_columns_to_jsonb
+Revises: add_trade_generated_columns
+Create Date: 2025-11-12 16:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'convert_journal_json_columns_to_jsonb'
+down_revision = 'add_trade_generated_columns'
+branch_labels = None
+depends_on = None
+
+JSON_COLUMNS = (
+    ('strategy_versions', 'config_data'),
+    ('watchlists', 'symbols'),
+    ('audit_logs', 'old_values'),
+    ('audit_logs', 'new_values'),
+)
+
+
+def upgrade():
+    # Text -> JSONB; empty strings become NULL. Safe to re-run on JSONB columns.
+    for table, column in JSON_COLUMNS:
+        op.execute(f"""
+            ALTER TABLE {table}
+            ALTER COLUMN {column} TYPE JSONB
+            USING NULLIF({column}::text, '')::jsonb;
+        """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_audit_log_new_values
+        ON audit_logs USING gin (new_values);
+    """)
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_audit_log_new_values;")
+    for table, column in JSON_COLUMNS:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE TEXT USING {column}::text;")
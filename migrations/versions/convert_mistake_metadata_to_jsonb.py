@@ -0,0 +1,34 @@
+"""Store mistakes and mistake_attachments metadata as JSONB
+
+Revision ID: convert_mistake_metadata_to_jsonb
+Revises: add_user_registered_on_index
+Create Date: 2025-11-12 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'convert_mistake_metadata_to_jsonb'
+down_revision = 'add_user_registered_on_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Text -> JSONB; empty strings become empty objects. Safe to re-run on JSONB columns.
+    for table in ('mistakes', 'mistake_attachments'):
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN metadata DROP DEFAULT;")
+        op.execute(f"""
+            ALTER TABLE {table}
+            ALTER COLUMN metadata TYPE JSONB
+            USING COALESCE(NULLIF(metadata::text, ''), '{{}}')::jsonb;
+        """)
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN metadata SET DEFAULT '{{}}'::jsonb;")
+
+
+def downgrade():
+    for table in ('mistakes', 'mistake_attachments'):
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN metadata DROP DEFAULT;")
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN metadata TYPE TEXT USING metadata::text;")
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN metadata SET DEFAULT '{{}}';")
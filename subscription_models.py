@@ -155,8 +155,9 @@ def establish_user_relationships():
     except Exception as e:
         print(f"Warning: Could not establish User relationships: {e}")
 
-def init_subscription_plans():
-    """Initialize default subscription plans"""
+def init_subscription_plans(commit=True):
+    """Initialize default subscription plans. With commit=False new plans are
+    left pending for the caller to commit."""
     plans = [
         {
             'name': 'monthly',
@@ -196,7 +197,8 @@ def init_subscription_plans():
             plan = SubscriptionPlan(**plan_data)
             db.session.add(plan)
     
-    db.session.commit()
+    if commit:
+        db.session.commit()
 
 def create_user_subscription(user_id, plan_name, payment_id=None, amount_paid=None):
     """Create a new subscription for user"""
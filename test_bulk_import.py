@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test /api/trades/bulk_import: a valid batch is inserted in one go, and a bad
+row is rejected with 400 naming its index before anything is written.
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+
+from database_config import get_postgres_url
+from journal import db, calculatentrade_bp, Trade
+
+app = Flask(__name__)
+app.config['SQLALCHEMY_DATABASE_URI'] = get_postgres_url()
+app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SECRET_KEY'] = 'test-secret-key'
+db.init_app(app)
+app.register_blueprint(calculatentrade_bp)
+
+URL = '/calculatentrade_journal/api/trades/bulk_import'
+
+
+def test_bulk_import_inserts_all_rows():
+    with app.app_context():
+        db.create_all()
+        with app.test_client() as client:
+            response = client.post(URL, json={'trades': [
+                {'symbol': 'TESTBULK', 'entry_price': 100, 'exit_price': 110, 'quantity': 2,
+                 'date': '2025-01-02T09:15:00'},
+                {'symbol': 'TESTBULK', 'entry_price': '100', 'exit_price': '95', 'quantity': '1'},
+            ]})
+            assert response.status_code == 200, response.data
+            body = response.get_json()
+            assert body['ok'] and body['count'] == 2
+
+            try:
+                first, second = (db.session.get(Trade, trade_id) for trade_id in body['ids'])
+                assert first.result == 'win' and first.pnl == 20
+                assert second.trade_type == 'short' and second.result == 'win'
+            finally:
+                Trade.query.filter(Trade.id.in_(body['ids'])).delete(synchronize_session=False)
+                db.session.commit()
+
+
+def test_bulk_import_rejects_bad_rows():
+    bad_batches = [
+        (['not a trade'], 'trade 0'),
+        ([{'symbol': 'TESTBULK', 'entry_price': 1, 'exit_price': 2},
+          {'symbol': 'TESTBULK', 'entry_price': 'abc', 'exit_price': 2}], 'trade 1'),
+        ([{'symbol': 'TESTBULK', 'entry_price': 1, 'exit_price': 2, 'date': '02/01/2025'}], 'trade 0'),
+    ]
+    with app.app_context():
+        db.create_all()
+        before = Trade.query.filter_by(symbol='TESTBULK').count()
+        with app.test_client() as client:
+            for trades, expected in bad_batches:
+                response = client.post(URL, json={'trades': trades})
+                assert response.status_code == 400, response.data
+                assert response.get_json()['message'].startswith(expected)
+        assert Trade.query.filter_by(symbol='TESTBULK').count() == before
+
+
+if __name__ == '__main__':
+    test_bulk_import_inserts_all_rows()
+    print("✅ Valid batch imported")
+    test_bulk_import_rejects_bad_rows()
+    print("✅ Bad rows rejected with their index")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test /api/dashboard/bulk_review: every listed trade gets one review note in a
+single UPDATE, and bad trade_ids are rejected before anything is written.
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime
+
+from flask import Flask
+
+from database_config import get_postgres_url
+from journal import db, calculatentrade_bp, Trade
+
+app = Flask(__name__)
+app.config['SQLALCHEMY_DATABASE_URI'] = get_postgres_url()
+app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SECRET_KEY'] = 'test-secret-key'
+db.init_app(app)
+app.register_blueprint(calculatentrade_bp)
+
+URL = '/calculatentrade_journal/api/dashboard/bulk_review'
+
+
+def test_bulk_review_marks_listed_trades():
+    with app.app_context():
+        db.create_all()
+        trades = [
+            Trade(symbol='TESTREVIEW', entry_price=100, exit_price=110, quantity=1, date=datetime.utcnow(),
+                  result='win', pnl=10, notes=notes)
+            for notes in (None, 'existing note', 'untouched')
+        ]
+        db.session.add_all(trades)
+        db.session.commit()
+        ids = [t.id for t in trades]
+
+        try:
+            with app.test_client() as client:
+                response = client.post(URL, json={'trade_ids': [ids[0], str(ids[1])]})
+                assert response.status_code == 200, response.data
+                assert response.get_json()['updated'] == 2
+
+            db.session.expire_all()
+            first, second, third = (db.session.get(Trade, trade_id) for trade_id in ids)
+            assert first.notes.startswith('\n[REVIEWED on ')
+            assert second.notes.startswith('existing note\n[REVIEWED on ')
+            assert third.notes == 'untouched'
+        finally:
+            Trade.query.filter(Trade.id.in_(ids)).delete(synchronize_session=False)
+            db.session.commit()
+
+
+def test_bulk_review_rejects_bad_ids():
+    with app.app_context():
+        with app.test_client() as client:
+            for payload in ({}, {'trade_ids': []}, {'trade_ids': 5}, {'trade_ids': ['abc']}):
+                response = client.post(URL, json=payload)
+                assert response.status_code == 400, (payload, response.data)
+                assert response.get_json()['success'] is False
+
+
+if __name__ == '__main__':
+    test_bulk_review_marks_listed_trades()
+    print("✅ Listed trades marked as reviewed")
+    test_bulk_review_rejects_bad_ids()
+    print("✅ Bad trade_ids rejected")
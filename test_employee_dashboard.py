@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Test the employee dashboard audit log pagination, the Redis rate limiter and
+that disabling a user commits together with its audit row.
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime, timedelta
+
+import employee_dashboard_bp as employee_dashboard
+
+
+class FakeRateLimitScript:
+    """Python stand-in for the _RATE_LIMIT_LUA sliding-window script over a dict of sorted sets"""
+
+    def __init__(self):
+        self.zsets = {}
+
+    def __call__(self, keys, args):
+        now, window, limit, member = args
+        zset = self.zsets.setdefault(keys[0], {})
+        for stale in [m for m, score in zset.items() if score <= now - window]:
+            del zset[stale]
+        if len(zset) >= limit:
+            return 0
+        zset[member] = now
+        return 1
+
+
+def test_rate_limit_does_not_record_rejected_requests():
+    fake = FakeRateLimitScript()
+    original = employee_dashboard._redis_client, employee_dashboard._rate_limit_script
+    employee_dashboard._redis_client = object()
+    employee_dashboard._rate_limit_script = fake
+    try:
+        results = [employee_dashboard.check_rate_limit(1, 'toggle', limit=3, window=60) for _ in range(5)]
+        assert results == [True, True, True, False, False]
+        # only the three allowed hits are in the window
+        zset = fake.zsets['rate_limit:1:toggle']
+        assert len(zset) == 3
+
+        # once the recorded hits age out, the next request is allowed again
+        for member in zset:
+            zset[member] -= 61
+        assert employee_dashboard.check_rate_limit(1, 'toggle', limit=3, window=60)
+    finally:
+        employee_dashboard._redis_client, employee_dashboard._rate_limit_script = original
+
+
+def test_audit_log_pages():
+    from flask import template_rendered
+    from jinja2 import ChoiceLoader, DictLoader
+    from app import app, db
+
+    action = 'test_audit_pagination'
+    captured = []
+
+    def record(sender, template, context, **extra):
+        captured.append(context)
+
+    # employee_audit.html is not shipped; the test only needs the route's context
+    app.jinja_env.loader = ChoiceLoader([DictLoader({'employee_audit.html': ''}), app.jinja_env.loader])
+
+    with app.app_context():
+        employee_dashboard.init_employee_dashboard_db(db)
+        AuditLog = employee_dashboard.AuditLog
+        EmployeeDashboard = employee_dashboard.EmployeeDashboard
+        EmpRole = employee_dashboard.EmpRole
+
+        admin_role = EmpRole.query.filter_by(name='admin').first()
+        employee = EmployeeDashboard(username='test_audit_admin', full_name='Test Audit Admin',
+                                     password_hash='x', role_id=admin_role.id)
+        db.session.add(employee)
+        db.session.commit()
+        start = datetime.utcnow()
+        db.session.add_all([
+            AuditLog(actor_id=employee.id, action=action, target_type='user', target_id=i,
+                     timestamp=start + timedelta(seconds=i))
+            for i in range(60)
+        ])
+        db.session.commit()
+
+        template_rendered.connect(record, app)
+        try:
+            with app.test_client() as client:
+                with client.session_transaction() as sess:
+                    sess['employee_logged_in'] = True
+                    sess['employee_id'] = employee.id
+
+                response = client.get(f'/employee/audit?action={action}')
+                assert response.status_code == 200, response.data
+                next_cursor = captured[-1]['next_cursor']
+                assert next_cursor
+                response = client.get('/employee/audit', query_string={'action': action, 'before': next_cursor})
+                assert response.status_code == 200, response.data
+
+            first, second = (context['audits'] for context in captured)
+            assert len(first.items) == 50 and first.has_next and not first.has_prev
+            assert [row['target_id'] for row in first.items[:2]] == [59, 58]
+            assert len(second.items) == 10 and second.has_prev and not second.has_next
+            assert second.items[0]['target_id'] == 9 and second.items[-1]['target_id'] == 0
+            assert captured[-1]['next_cursor'] is None
+        finally:
+            template_rendered.disconnect(record, app)
+            AuditLog.query.filter_by(action=action).delete()
+            db.session.delete(employee)
+            db.session.commit()
+
+
+def test_failed_audit_rolls_back_disable():
+    from flask import Flask
+    from flask_sqlalchemy import SQLAlchemy
+    from sqlalchemy import text
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SECRET_KEY'] = 'test-secret-key'
+    db = SQLAlchemy(app)
+
+    class Users(db.Model):
+        # referenced by emp_user_session.user_id
+        __tablename__ = 'users'
+        id = db.Column(db.Integer, primary_key=True)
+
+    app.register_blueprint(employee_dashboard.employee_dashboard_bp)
+
+    with app.app_context():
+        employee_dashboard.init_employee_dashboard_db(db)
+        db.session.execute(text(
+            "CREATE TABLE user (id INTEGER PRIMARY KEY, email TEXT, name TEXT, verified BOOLEAN, "
+            "subscription_active BOOLEAN, registered_on DATETIME)"
+        ))
+        db.session.execute(text("INSERT INTO user (id, email, verified) VALUES (1, 'disable@example.com', 1)"))
+        db.session.commit()
+
+        # An audit row with no action violates NOT NULL when log_audit commits
+        AuditLog = employee_dashboard.AuditLog
+        employee_dashboard.AuditLog = lambda **kwargs: AuditLog(**dict(kwargs, action=None))
+        try:
+            with app.test_client() as client:
+                with client.session_transaction() as sess:
+                    sess['employee_logged_in'] = True
+                    sess['employee_id'] = 1
+                    sess['employee_role'] = 'admin'
+                    sess['employee_active_until'] = (datetime.utcnow() + timedelta(minutes=5)).isoformat()
+
+                response = client.post('/employee/api/user/1/disable-login')
+                assert response.status_code == 500, response.data
+        finally:
+            employee_dashboard.AuditLog = AuditLog
+
+        assert db.session.execute(text("SELECT verified FROM user WHERE id = 1")).scalar() == 1
+        assert AuditLog.query.count() == 0
+
+
+if __name__ == '__main__':
+    test_rate_limit_does_not_record_rejected_requests()
+    print("✅ Rejected requests are not recorded as hits")
+    test_audit_log_pages()
+    print("✅ Audit log pages through all entries")
+    test_failed_audit_rolls_back_disable()
+    print("✅ A failed audit insert rolls back the disable")